@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Counting the file_hashes table on every insert would make hashing a large
+# project quadratic, so the cap is enforced once per this many new hashes
+FILE_HASH_EVICT_INTERVAL = 1000
+
+# Paths looked up per query; stays below SQLite's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Cache reads record their access time in memory and write it back in one
+# transaction with the next cache write, or once this many reads accumulate
+TOUCH_FLUSH_INTERVAL = 1000
+
+
+def sha256_file(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Persistent, content-addressed cache of architecture analyses.
+
+    Results are stored in a local SQLite database and keyed on the content
+    hashes of the files fed to the model, the prompt template version and the
+    model name. Per-file hashes are memoized by (size, mtime) so unchanged
+    files are not re-read on every request. Entries are evicted in LRU order
+    once the cache exceeds `max_entries` or `max_bytes`.
+
+    Per-file summaries produced by the map step of the analysis pipeline and
+    structural code index entries are kept in separate tables, capped at
+    `max_summaries` and `max_index_entries` entries; their access times are
+    batched and written back with the next cache write. Memoized file hashes are
+    capped at `max_file_hashes`; the least recently hashed paths go first.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 max_summaries: int = 20000, max_index_entries: int = 100000,
+                 max_file_hashes: int = 200000):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, 'analysis_cache.sqlite3')
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_summaries = max_summaries
+        self.max_index_entries = max_index_entries
+        self.max_file_hashes = max_file_hashes
+        self.hits = 0
+        self.misses = 0
+        self._hash_inserts = 0
+        self._touches = {'file_summaries': {}, 'code_index': {}}
+        self._pending_touches = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS analyses_last_access ON analyses (last_access);
+            CREATE TABLE IF NOT EXISTS file_summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS file_summaries_last_access ON file_summaries (last_access);
+            CREATE TABLE IF NOT EXISTS code_index (
+                key TEXT PRIMARY KEY,
+                entry TEXT NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS code_index_last_access ON code_index (last_access);
+        ''')
+        self._conn.commit()
+
+    def file_hashes(self, file_paths: list) -> dict:
+        """Return {path: sha256} for `file_paths`, re-reading only files whose size or mtime changed.
+
+        Known hashes are looked up in batches and new ones are written in a
+        single transaction. Files that cannot be read are reported and left out.
+        """
+        stats = {}
+        for file_path in file_paths:
+            try:
+                stats[file_path] = os.stat(file_path)
+            except OSError as e:
+                print(f"Error hashing file {file_path}: {str(e)}")
+
+        known = {}
+        paths = list(stats)
+        with self._lock:
+            for offset in range(0, len(paths), LOOKUP_BATCH_SIZE):
+                batch = paths[offset:offset + LOOKUP_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f'SELECT path, size, mtime_ns, sha256 FROM file_hashes '
+                    f'WHERE path IN ({", ".join("?" * len(batch))})', batch
+                )
+                known.update((row[0], row[1:]) for row in rows)
+
+        hashes = {}
+        new_rows = []
+        for file_path, stat in stats.items():
+            row = known.get(file_path)
+            if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                hashes[file_path] = row[2]
+                continue
+            try:
+                hashes[file_path] = sha256_file(file_path)
+            except OSError as e:
+                print(f"Error hashing file {file_path}: {str(e)}")
+                continue
+            new_rows.append((file_path, stat.st_size, stat.st_mtime_ns, hashes[file_path]))
+
+        if new_rows:
+            with self._lock:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)',
+                    new_rows
+                )
+                previous = self._hash_inserts
+                self._hash_inserts += len(new_rows)
+                if previous // FILE_HASH_EVICT_INTERVAL != self._hash_inserts // FILE_HASH_EVICT_INTERVAL:
+                    self._evict_file_hashes()
+                self._conn.commit()
+        return hashes
+
+    def _evict_file_hashes(self):
+        count = self._conn.execute('SELECT COUNT(*) FROM file_hashes').fetchone()[0]
+        if count > self.max_file_hashes:
+            # INSERT OR REPLACE gives a re-hashed path a new rowid, so the
+            # lowest rowids are the paths hashed longest ago
+            self._conn.execute(
+                'DELETE FROM file_hashes WHERE rowid IN '
+                '(SELECT rowid FROM file_hashes ORDER BY rowid ASC LIMIT ?)',
+                (count - self.max_file_hashes,)
+            )
+
+    def build_key(self, source_path: str, file_paths: list, file_types_found: dict,
+                  model: str, prompt_version: int) -> str:
+        """Combine file content hashes, file-type counts, prompt version and model into a key."""
+        hashes = self.file_hashes(sorted(file_paths))
+        files = [[os.path.relpath(file_path, source_path), sha256] for file_path, sha256 in hashes.items()]
+        payload = json.dumps({
+            'model': model,
+            'prompt_version': prompt_version,
+            'file_types_found': file_types_found,
+            'files': files,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str):
+        """Return the cached analysis for `key`, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute('SELECT result FROM analyses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute('UPDATE analyses SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._flush_touches()
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, result: dict):
+        """Store an analysis and evict least recently used entries over the limits."""
+        data = json.dumps(result)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO analyses (key, result, size, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, data, len(data), now, now)
+            )
+            self._evict()
+            self._flush_touches()
+            self._conn.commit()
+
+    def _evict(self):
+        count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        rows = self._conn.execute('SELECT key, size FROM analyses ORDER BY last_access ASC').fetchall()
+        for key, size in rows:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM analyses WHERE key = ?', (key,))
+            count -= 1
+            total -= size
+
+    def _lru_get(self, table: str, column: str, key: str):
+        with self._lock:
+            row = self._conn.execute(f'SELECT {column} FROM {table} WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._touches[table][key] = time.time()
+            self._pending_touches += 1
+            if self._pending_touches >= TOUCH_FLUSH_INTERVAL:
+                self._flush_touches()
+                self._conn.commit()
+        return row[0]
+
+    def _flush_touches(self):
+        for table, touches in self._touches.items():
+            if touches:
+                self._conn.executemany(
+                    f'UPDATE {table} SET last_access = ? WHERE key = ?',
+                    [(accessed, key) for key, accessed in touches.items()]
+                )
+                touches.clear()
+        self._pending_touches = 0
+
+    def _lru_put(self, table: str, column: str, items: list, limit: int):
+        """Store (key, value) pairs in one transaction, dropping the least recently used over `limit`."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._flush_touches()
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO {table} (key, {column}, last_access) VALUES (?, ?, ?)',
+                [(key, value, now) for key, value in items]
+            )
+            count = self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+            if count > limit:
+                self._conn.execute(
+                    f'DELETE FROM {table} WHERE key IN '
+                    f'(SELECT key FROM {table} ORDER BY last_access ASC LIMIT ?)',
+                    (count - limit,)
+                )
+            self._conn.commit()
+
+    def get_summary(self, key: str):
+        """Return a cached per-file summary, or None."""
+        return self._lru_get('file_summaries', 'summary', key)
+
+    def put_summaries(self, summaries: dict):
+        """Store per-file summaries by key, dropping the least recently used ones over the cap."""
+        self._lru_put('file_summaries', 'summary', list(summaries.items()), self.max_summaries)
+
+    def get_index(self, key: str):
+        """Return a cached code index entry, or None."""
+        entry = self._lru_get('code_index', 'entry', key)
+        return json.loads(entry) if entry is not None else None
+
+    def put_index_entries(self, entries: dict):
+        """Store code index entries by key, dropping the least recently used ones over the cap."""
+        self._lru_put('code_index', 'entry', [
+            (key, json.dumps(entry, separators=(',', ':'))) for key, entry in entries.items()
+        ], self.max_index_entries)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current cache occupancy."""
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses'
+            ).fetchone()
+            summaries = self._conn.execute('SELECT COUNT(*) FROM file_summaries').fetchone()[0]
+            index_entries = self._conn.execute('SELECT COUNT(*) FROM code_index').fetchone()[0]
+            file_hashes = self._conn.execute('SELECT COUNT(*) FROM file_hashes').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': count,
+            'bytes': total,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'file_summaries': summaries,
+            'code_index_entries': index_entries,
+            'file_hashes': file_hashes,
+        }
@@ -0,0 +1,194 @@
+"""Reproducible benchmark for the AutoDoc analysis pipeline.
+
+Generates synthetic project trees (with node_modules/venv-style noise and
+.gitignore'd build output), starts the local Ollama stub and measures the
+walk, the cold LLM path and the warm cache path, reporting the per-stage
+timings and counters collected by the pipeline metrics:
+
+    python benchmark.py --files 10000,100000 --noise 0.8 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from ollama_stub import start_stub
+
+NOISE_DIRS = [('node_modules', 0.7), ('venv/lib/site-packages', 0.2), ('build', 0.1)]
+
+PYTHON_TEMPLATE = '''"""Module {index} of the synthetic project."""
+import os
+from {package}.mod_{previous} import Service{previous}
+
+
+class Service{index}(Service{previous}):
+    """Service number {index}."""
+
+    def handle(self, request: dict) -> dict:
+        return {{"id": {index}, "path": os.getcwd()}}
+
+
+def helper_{index}(value: int) -> int:
+    """Return a derived value."""
+    return value * {index}
+'''
+
+JSX_TEMPLATE = '''import React from "react";
+import Widget{previous} from "./Widget{previous}";
+
+export default function Widget{index}({{ data }}) {{
+  return <Widget{previous} data={{data}} />;
+}}
+'''
+
+NOISE_TEMPLATE = 'module.exports = function noise() { return 0; };\n'
+
+
+def generate_tree(root: str, total_files: int, noise: float, seed: int) -> dict:
+    """Create (or reuse) a synthetic project with `total_files` files.
+
+    A `noise` share of the files goes to excluded or ignored directories; the
+    rest is a mix of Python modules, JSX components, docs and config files.
+    """
+    # The marker lives next to the tree so the walk does not count it as a config file
+    marker = os.path.normpath(root) + '.benchmark.json'
+    spec = {'total_files': total_files, 'noise': noise, 'seed': seed}
+    try:
+        with open(marker, 'r', encoding='utf-8') as f:
+            if json.load(f) == spec:
+                return spec
+    except (OSError, ValueError):
+        pass
+
+    # Drop the marker first so an interrupted generation is redone on the next run
+    if os.path.exists(marker):
+        os.remove(marker)
+    shutil.rmtree(root, ignore_errors=True)
+    os.makedirs(root)
+    rng = random.Random(seed)
+    created_dirs = set()
+
+    def write(rel_path: str, content: str):
+        directory = os.path.dirname(os.path.join(root, rel_path))
+        if directory not in created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            created_dirs.add(directory)
+        with open(os.path.join(root, rel_path), 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    write('.gitignore', 'build/\n*.log\n')
+    noise_files = int(total_files * noise)
+    project_files = total_files - noise_files - 1
+
+    for index in range(project_files):
+        kind = rng.random()
+        package = f'pkg_{index // 50}'
+        previous = max(index - 1, 0)
+        if kind < 0.5:
+            write(f'src/{package}/mod_{index}.py',
+                  PYTHON_TEMPLATE.format(index=index, previous=previous, package=package))
+        elif kind < 0.8:
+            write(f'frontend/{package}/Widget{index}.jsx', JSX_TEMPLATE.format(index=index, previous=previous))
+        elif kind < 0.9:
+            write(f'docs/{package}/page_{index}.md', f'# Page {index}\n')
+        else:
+            write(f'config/{package}/settings_{index}.json', json.dumps({'id': index}))
+
+    for index in range(noise_files):
+        roll = rng.random()
+        for directory, share in NOISE_DIRS:
+            roll -= share
+            if roll < 0:
+                break
+        write(f'{directory}/lib_{index // 200}/dist/file_{index}.js', NOISE_TEMPLATE)
+
+    with open(marker, 'w', encoding='utf-8') as f:
+        json.dump(spec, f)
+    return spec
+
+
+async def run_pipeline(main, source_path: str) -> dict:
+    """Measure the walk, a cold full analysis and a warm cached analysis."""
+    results = {}
+    async with main.lifespan(main.app):
+        start = time.perf_counter()
+        file_types_found, source_files = await asyncio.to_thread(main.analyze_files, source_path)
+        results['walk'] = {
+            'seconds': time.perf_counter() - start,
+            'files': sum(file_types_found.values()),
+        }
+
+        for name, force_refresh in [('llm_cold', True), ('cache_warm', False)]:
+            with main.pipeline_metrics.track_request() as request_metrics:
+                start = time.perf_counter()
+                sections = await main.analyze_architecture_with_ollama(
+                    source_path, file_types_found, source_files, force_refresh=force_refresh
+                )
+                request_metrics['seconds'] = time.perf_counter() - start
+                request_metrics['sections'] = len(sections)
+            results[name] = request_metrics
+    return results
+
+
+def print_report(size: int, results: dict):
+    print(f"\n== {size} files ==")
+    walk = results['walk']
+    print(f"walk: {walk['seconds']:.3f}s for {walk['files']} project files "
+          f"({walk['files'] / max(walk['seconds'], 1e-9):,.0f} files/s)")
+    for name in ('llm_cold', 'cache_warm'):
+        run = results[name]
+        print(f"{name}: {run['seconds']:.3f}s, {run['sections']} sections")
+        for stage, stats in sorted(run['stages'].items()):
+            print(f"  {stage:<20} {stats['total_seconds']:8.3f}s  x{stats['count']}")
+        for counter, value in sorted(run['counters'].items()):
+            print(f"  {counter:<20} {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--files', default='10000',
+                        help='comma-separated total file counts per tree, e.g. 10000,100000,1000000')
+    parser.add_argument('--noise', type=float, default=0.8,
+                        help='share of files placed in node_modules/venv/ignored directories')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--root', default=os.path.join(tempfile.gettempdir(), 'autodoc-benchmark'),
+                        help='where synthetic trees are generated and reused between runs')
+    parser.add_argument('--latency', type=float, default=0.0, help='stub latency per request in seconds')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='stub token rate, 0 for unlimited')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    stub = start_stub(0, args.latency, args.tokens_per_second)
+    cache_dir = tempfile.mkdtemp(prefix='autodoc-benchmark-cache-')
+    # main reads its configuration from the environment at import time
+    os.environ['OLLAMA_URL'] = f"http://127.0.0.1:{stub.server_address[1]}/api/generate"
+    os.environ['AUTODOC_CACHE_DIR'] = cache_dir
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import main as autodoc
+
+    report = {}
+    try:
+        for size in [int(value) for value in args.files.split(',')]:
+            source_path = os.path.join(args.root, f'tree-{size}-{args.noise}-{args.seed}')
+            start = time.perf_counter()
+            generate_tree(source_path, size, args.noise, args.seed)
+            print(f"tree with {size} files ready in {time.perf_counter() - start:.1f}s: {source_path}",
+                  file=sys.stderr)
+            report[size] = asyncio.run(run_pipeline(autodoc, source_path))
+            if not args.json:
+                print_report(size, report[size])
+    finally:
+        stub.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
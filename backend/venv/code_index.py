@@ -0,0 +1,303 @@
+import ast
+import multiprocessing
+import os
+import posixpath
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# Bump whenever the shape of index entries changes so cached entries are rebuilt
+INDEX_VERSION = 1
+
+PYTHON_EXTENSIONS = {'.py', '.pyi', '.pyw'}
+SCRIPT_EXTENSIONS = {'.js', '.jsx', '.mjs', '.cjs', '.ts', '.tsx'}
+
+# Directories absolute Python imports are resolved against, like sys.path entries
+IMPORT_ROOTS = ('', 'src')
+
+# Below this many files the process pool start-up costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+MAX_DOC_CHARS = 120
+MAX_RAW_LINES = 40
+
+JS_IMPORT_RE = re.compile(
+    r'''(?:^|[^\w.$])(?:import\s+(?:[\w*{}\s,$]+\s+from\s+)?|export\s+[\w*{}\s,$]+\s+from\s+|require\s*\(\s*|import\s*\(\s*)['"]([^'"]+)['"]''',
+    re.MULTILINE
+)
+JS_CLASS_RE = re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+([\w$]+)(?:\s+extends\s+([\w$.]+))?', re.MULTILINE)
+JS_FUNCTION_RE = re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(async\s+)?function\s*\*?\s*([\w$]+)\s*(\([^)]*\))', re.MULTILINE)
+JS_ARROW_RE = re.compile(
+    r'^\s*(?:export\s+)?(?:const|let|var)\s+([\w$]+)\s*(?::[^=]+)?=\s*(async\s+)?(\([^)]*\)|[\w$]+)\s*(?::[^=]+)?=>',
+    re.MULTILINE
+)
+JS_DOC_RE = re.compile(r'^\s*/\*\*?\s*(.*?)\*/', re.DOTALL)
+
+_executor = None
+
+
+def _first_line(text) -> str:
+    if not text:
+        return ''
+    line = text.strip().split('\n', 1)[0].strip()
+    return line[:MAX_DOC_CHARS]
+
+
+def _python_signature(node) -> str:
+    prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+    signature = f"{prefix} {node.name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+    return signature
+
+
+def _index_python(text: str) -> dict:
+    tree = ast.parse(text)
+    entry = {'language': 'python', 'doc': _first_line(ast.get_docstring(tree)),
+             'imports': [], 'classes': [], 'functions': []}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            entry['imports'].extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            entry['imports'].append('.' * node.level + (node.module or ''))
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            entry['classes'].append({
+                'name': node.name,
+                'bases': [ast.unparse(base) for base in node.bases],
+                'doc': _first_line(ast.get_docstring(node)),
+                'methods': [
+                    _python_signature(item) for item in node.body
+                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                ],
+            })
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            entry['functions'].append({
+                'signature': _python_signature(node),
+                'doc': _first_line(ast.get_docstring(node)),
+            })
+    return entry
+
+
+def _index_script(text: str) -> dict:
+    doc_match = JS_DOC_RE.match(text)
+    entry = {'language': 'javascript', 'doc': _first_line(doc_match.group(1)) if doc_match else '',
+             'imports': [], 'classes': [], 'functions': []}
+    for match in JS_IMPORT_RE.finditer(text):
+        if match.group(1) not in entry['imports']:
+            entry['imports'].append(match.group(1))
+    for match in JS_CLASS_RE.finditer(text):
+        entry['classes'].append({
+            'name': match.group(1),
+            'bases': [match.group(2)] if match.group(2) else [],
+            'doc': '',
+            'methods': [],
+        })
+    for match in JS_FUNCTION_RE.finditer(text):
+        prefix = 'async function' if match.group(1) else 'function'
+        entry['functions'].append({'signature': f"{prefix} {match.group(2)}{match.group(3)}", 'doc': ''})
+    for match in JS_ARROW_RE.finditer(text):
+        prefix = 'async ' if match.group(2) else ''
+        entry['functions'].append({'signature': f"const {match.group(1)} = {prefix}{match.group(3)} =>", 'doc': ''})
+    return entry
+
+
+def index_file(file_path: str) -> dict:
+    """Parse one source file into a compact structural index entry.
+
+    Python is parsed with `ast`; JavaScript/TypeScript is scanned with regular
+    expressions for imports, classes and functions. Other files (Dockerfile,
+    Makefile, unparsable sources) keep their first lines verbatim.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except Exception as e:
+        return {'language': 'unknown', 'error': str(e)}
+
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext in PYTHON_EXTENSIONS:
+            return _index_python(text)
+        if ext in SCRIPT_EXTENSIONS:
+            return _index_script(text)
+    except (SyntaxError, ValueError, RecursionError) as e:
+        return {'language': 'unknown', 'error': str(e), 'raw': '\n'.join(text.splitlines()[:MAX_RAW_LINES])}
+    return {'language': 'raw', 'raw': '\n'.join(text.splitlines()[:MAX_RAW_LINES])}
+
+
+def _get_executor(workers) -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # The pool is started from a worker thread of a multi-threaded server,
+        # where forking can copy locks held by other threads and deadlock
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the indexing process pool, if one was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def build_code_index(source_path: str, file_paths: list, cache, workers=None) -> dict:
+    """Index source files, keyed by path relative to `source_path`.
+
+    Entries are cached by file content hash, so each file is parsed once;
+    uncached files are parsed in parallel across a process pool.
+    """
+    index = {}
+    pending = {}
+    for file_path, file_hash in cache.file_hashes(file_paths).items():
+        rel_path = os.path.relpath(file_path, source_path).replace(os.sep, '/')
+        key = f"{file_hash}:{INDEX_VERSION}"
+        entry = cache.get_index(key)
+        if entry is not None:
+            index[rel_path] = entry
+        else:
+            pending[file_path] = (rel_path, key)
+
+    paths = list(pending)
+    if len(paths) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(paths) // (4 * (workers or os.cpu_count() or 1)))
+        entries = _get_executor(workers).map(index_file, paths, chunksize=chunksize)
+    else:
+        entries = map(index_file, paths)
+
+    new_entries = {}
+    for file_path, entry in zip(paths, entries):
+        rel_path, key = pending[file_path]
+        index[rel_path] = entry
+        if 'error' not in entry:
+            new_entries[key] = entry
+    cache.put_index_entries(new_entries)
+    return index
+
+
+def _python_module_name(rel_path: str) -> str:
+    module = os.path.splitext(rel_path)[0].replace('/', '.')
+    if module.endswith('.__init__'):
+        module = module[:-len('.__init__')]
+    return module
+
+
+def _resolve_python_import(name: str, rel_path: str, modules: dict, packages: set):
+    if name.startswith('.'):
+        level = len(name) - len(name.lstrip('.'))
+        package = _python_module_name(rel_path).split('.')
+        if not rel_path.endswith('__init__.py'):
+            package = package[:-1]
+        package = package[:len(package) - (level - 1)] if level > 1 else package
+        name = '.'.join(package + [part for part in [name.lstrip('.')] if part])
+        prefixes = ['']
+    else:
+        # Absolute imports resolve against the import roots, and against the
+        # importing file's own directory when that is a plain script directory
+        # (run as `python main.py`, with `import utils` next to it)
+        directory = posixpath.dirname(rel_path)
+        prefixes = [''] if not directory or directory in packages else [directory.replace('/', '.') + '.', '']
+    for prefix in prefixes:
+        parts = name.split('.')
+        while parts:
+            candidate = prefix + '.'.join(parts)
+            if candidate in modules:
+                return modules[candidate]
+            parts.pop()
+    return None
+
+
+def _resolve_script_import(specifier: str, rel_path: str, files: set):
+    base = posixpath.normpath(posixpath.join(posixpath.dirname(rel_path), specifier))
+    for suffix in ['', *SCRIPT_EXTENSIONS, *(f'/index{ext}' for ext in SCRIPT_EXTENSIONS)]:
+        if base + suffix in files:
+            return base + suffix
+    return None
+
+
+def build_import_graph(index: dict) -> dict:
+    """Resolve each file's imports to project files (internal) or packages (external)."""
+    files = set(index)
+    # Map the full dotted path of every Python module below each import root to
+    # its file; a bare name only matches a module at the root, so `import types`
+    # does not resolve to some pkg/types.py
+    modules = {}
+    packages = set()
+    for rel_path in sorted(files, key=lambda path: path.count('/')):
+        if os.path.splitext(rel_path)[1] not in PYTHON_EXTENSIONS:
+            continue
+        if posixpath.basename(rel_path) == '__init__.py':
+            packages.add(posixpath.dirname(rel_path))
+        for root in IMPORT_ROOTS:
+            if not root or rel_path.startswith(root + '/'):
+                modules.setdefault(_python_module_name(rel_path[len(root) + 1 if root else 0:]), rel_path)
+
+    graph = {}
+    for rel_path, entry in index.items():
+        internal = []
+        external = []
+        for name in entry.get('imports', []):
+            if entry['language'] == 'python':
+                target = _resolve_python_import(name, rel_path, modules, packages)
+                package = name.split('.')[0]
+            else:
+                target = _resolve_script_import(name, rel_path, files) if name.startswith('.') else None
+                package = '/'.join(name.split('/')[:2]) if name.startswith('@') else name.split('/')[0]
+            if target and target != rel_path:
+                if target not in internal:
+                    internal.append(target)
+            elif not target and not name.startswith('.') and package not in external:
+                external.append(package)
+        graph[rel_path] = {'internal': internal, 'external': external}
+    return graph
+
+
+def format_outline(entry: dict) -> str:
+    """Render an index entry as the compact outline sent to the model."""
+    lines = []
+    if entry.get('doc'):
+        lines.append(f"Doc: {entry['doc']}")
+    if entry.get('imports'):
+        lines.append(f"Imports: {', '.join(entry['imports'])}")
+    for cls in entry.get('classes', []):
+        bases = f"({', '.join(cls['bases'])})" if cls['bases'] else ''
+        doc = f" - {cls['doc']}" if cls['doc'] else ''
+        lines.append(f"class {cls['name']}{bases}{doc}")
+        lines.extend(f"  {method}" for method in cls['methods'])
+    for function in entry.get('functions', []):
+        doc = f" - {function['doc']}" if function['doc'] else ''
+        lines.append(f"{function['signature']}{doc}")
+    if entry.get('raw'):
+        lines.append(entry['raw'])
+    return '\n'.join(lines)
+
+
+def format_import_graph(graph: dict) -> str:
+    """Render the import graph as one `file -> dependencies` line per file.
+
+    Files imported by the most other files come first, then those importing
+    the most project files, so truncating the text keeps the central modules.
+    """
+    in_degree = {}
+    for deps in graph.values():
+        for target in deps['internal']:
+            in_degree[target] = in_degree.get(target, 0) + 1
+    ranked = sorted(graph, key=lambda rel_path: (
+        -in_degree.get(rel_path, 0), -len(graph[rel_path]['internal']), rel_path
+    ))
+    lines = []
+    for rel_path in ranked:
+        internal = graph[rel_path]['internal']
+        external = graph[rel_path]['external']
+        if not internal and not external:
+            continue
+        parts = []
+        if internal:
+            parts.append(', '.join(internal))
+        if external:
+            parts.append(f"external: {', '.join(external)}")
+        lines.append(f"{rel_path} -> {'; '.join(parts)}")
+    return '\n'.join(lines)
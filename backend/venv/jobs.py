@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Job lifecycle states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """SQLite-backed persistence for analysis jobs.
+
+    Finished jobs are kept for polling up to `max_finished_jobs`; the least
+    recently finished ones are deleted whenever a new job is created.
+    """
+
+    def __init__(self, cache_dir: str, max_finished_jobs: int = 500):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, 'jobs.sqlite3')
+        self.max_finished_jobs = max_finished_jobs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                source_path TEXT NOT NULL,
+                force_refresh INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_source_status ON jobs (source_path, status);
+        ''')
+        self._conn.commit()
+
+    def create(self, source_path: str, force_refresh: bool) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO jobs (id, source_path, force_refresh, status, progress, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, source_path, int(force_refresh), QUEUED, '{}', now, now)
+            )
+            self._conn.execute(
+                'DELETE FROM jobs WHERE id IN ('
+                'SELECT id FROM jobs WHERE status IN (?, ?, ?) ORDER BY updated_at DESC LIMIT -1 OFFSET ?)',
+                (*FINISHED_STATES, self.max_finished_jobs)
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, source_path, force_refresh, status, progress, result, error, created_at, updated_at '
+                'FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def find_active(self, source_path: str, force_refresh: bool = False):
+        """Return the queued or running job for `source_path`, if any.
+
+        A `force_refresh` request only matches refresh jobs, since a regular
+        job may answer from the cache; any active job satisfies a regular one.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id FROM jobs WHERE source_path = ? AND status IN (?, ?) AND force_refresh >= ? '
+                'ORDER BY created_at LIMIT 1',
+                (source_path, *ACTIVE_STATES, int(force_refresh))
+            ).fetchone()
+        return self.get(row[0]) if row else None
+
+    def list_active(self) -> list:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at', ACTIVE_STATES
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def update(self, job_id: str, expected_status: str = None, **fields) -> bool:
+        """Update status, progress, result or error of a job.
+
+        With `expected_status` the update only applies while the job is still
+        in that state, so concurrent transitions cannot overwrite each other.
+        Returns whether the job was updated.
+        """
+        for key in ('progress', 'result'):
+            if key in fields:
+                fields[key] = json.dumps(fields[key])
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f'{key} = ?' for key in fields)
+        query = f'UPDATE jobs SET {assignments} WHERE id = ?'
+        params = (*fields.values(), job_id)
+        if expected_status is not None:
+            query += ' AND status = ?'
+            params += (expected_status,)
+        with self._lock:
+            updated = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return updated > 0
+
+    def cancel(self, job_id: str) -> bool:
+        """Mark a queued or running job cancelled; returns whether it was active."""
+        with self._lock:
+            updated = self._conn.execute(
+                'UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN (?, ?)',
+                (CANCELLED, time.time(), job_id, *ACTIVE_STATES)
+            ).rowcount
+            self._conn.commit()
+        return updated > 0
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        return {
+            'id': row[0],
+            'source_path': row[1],
+            'force_refresh': bool(row[2]),
+            'status': row[3],
+            'progress': json.loads(row[4]),
+            'result': json.loads(row[5]) if row[5] else None,
+            'error': row[6],
+            'created_at': row[7],
+            'updated_at': row[8],
+        }
+
+
+class JobQueue:
+    """Worker pool that runs analysis jobs in the background.
+
+    `runner(source_path, force_refresh, report)` is awaited for each job and
+    must return the job result; `report(**counters)` merges progress counters
+    into the job state without blocking, and the counters are persisted in the
+    background with at most one write in flight per job. Identical in-flight requests for the same
+    source path share one job (a refresh never joins a cached run), and jobs left queued or running by a previous
+    process are re-queued on start.
+    """
+
+    def __init__(self, store: JobStore, runner, workers: int = 2):
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self._queue = None
+        self._worker_tasks = []
+        self._running = {}
+        self._submit_lock = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._submit_lock = asyncio.Lock()
+        for job_id in await asyncio.to_thread(self.store.list_active):
+            await asyncio.to_thread(self.store.update, job_id, status=QUEUED)
+            self._queue.put_nowait(job_id)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, source_path: str, force_refresh: bool = False) -> dict:
+        """Queue a job for `source_path`, or return the one already in flight."""
+        async with self._submit_lock:
+            job = await asyncio.to_thread(self.store.find_active, source_path, force_refresh)
+            if job:
+                return job
+            job = await asyncio.to_thread(self.store.create, source_path, force_refresh)
+        self._queue.put_nowait(job['id'])
+        return job
+
+    async def cancel(self, job_id: str):
+        """Cancel a queued or running job; returns the updated job or None if unknown."""
+        if await asyncio.to_thread(self.store.cancel, job_id):
+            task = self._running.get(job_id)
+            if task:
+                task.cancel()
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        # Register the task before the first await so that a cancel arriving
+        # while the job is being picked up still finds something to cancel
+        task = asyncio.create_task(self._execute(job_id))
+        self._running[job_id] = task
+        try:
+            await task
+        except asyncio.CancelledError:
+            # Only propagate when the worker itself is being stopped, not when
+            # the job was cancelled through the API
+            if asyncio.current_task().cancelling():
+                raise
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _execute(self, job_id: str):
+        try:
+            job = await asyncio.to_thread(self.store.get, job_id)
+            # Skip jobs cancelled while they were still queued
+            if job is None or not await asyncio.to_thread(
+                self.store.update, job_id, expected_status=QUEUED, status=RUNNING
+            ):
+                return
+
+            progress = dict(job['progress'])
+            writer = None
+
+            async def write_progress():
+                # Reports made while a write is in flight are coalesced into the next one
+                while True:
+                    written = dict(progress)
+                    await asyncio.to_thread(self.store.update, job_id, progress=written)
+                    if progress == written:
+                        return
+
+            def report(**counters):
+                nonlocal writer
+                progress.update(counters)
+                if writer is None or writer.done():
+                    writer = asyncio.create_task(write_progress())
+
+            result = await self.runner(job['source_path'], job['force_refresh'], report)
+            # Let the last progress write land before the final state is stored
+            if writer is not None:
+                await writer
+            # A job cancelled just as it finished stays cancelled
+            await asyncio.to_thread(
+                self.store.update, job_id, expected_status=RUNNING, status=COMPLETED, result=result
+            )
+        except asyncio.CancelledError:
+            # Jobs interrupted by a shutdown are picked up again on the next
+            # start; a job cancelled through the API is no longer RUNNING
+            await asyncio.to_thread(self.store.update, job_id, expected_status=RUNNING, status=QUEUED)
+            raise
+        except Exception as e:
+            print(f"Error running job {job_id}: {str(e)}")
+            await asyncio.to_thread(self.store.update, job_id, expected_status=RUNNING, status=FAILED, error=str(e))
@@ -0,0 +1,1363 @@
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel
+import os
+import json
+import httpx
+import asyncio
+import pathlib
+import re
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus.flowables import Flowable, FrameBG
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from io import BytesIO
+import fpdf
+from analysis_cache import AnalysisCache
+from jobs import JobQueue, JobStore
+from manifest import ProjectManifests, diff_files
+from metrics import PipelineMetrics
+from code_index import (
+    PYTHON_EXTENSIONS, SCRIPT_EXTENSIONS, build_code_index, build_import_graph,
+    format_import_graph, format_outline, shutdown_executor
+)
+
+class FolderRequest(BaseModel):
+    source_path: str
+    force_refresh: bool = False
+    include_metrics: bool = False
+    # destination_path: str
+
+class DocumentationData(BaseModel):
+    data: dict
+
+OLLAMA_URL = os.environ.get('OLLAMA_URL', 'http://localhost:11434/api/generate')
+OLLAMA_MODEL = os.environ.get('OLLAMA_MODEL', 'codellama')
+
+# Shared Ollama client settings: generation can legitimately take minutes, connecting should not
+OLLAMA_TIMEOUT = httpx.Timeout(float(os.environ.get('OLLAMA_TIMEOUT', '300')), connect=10.0)
+OLLAMA_MAX_RETRIES = int(os.environ.get('OLLAMA_MAX_RETRIES', '3'))
+OLLAMA_RETRY_BACKOFF = 0.5
+OLLAMA_CONCURRENCY = int(os.environ.get('OLLAMA_CONCURRENCY', '4'))
+
+# Number of background analysis jobs that run at the same time
+JOB_WORKERS = int(os.environ.get('AUTODOC_JOB_WORKERS', '2'))
+
+ollama_client = None
+ollama_semaphore = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open one pooled Ollama client for the lifetime of the server."""
+    global ollama_client, ollama_semaphore
+    ollama_client = httpx.AsyncClient(
+        timeout=OLLAMA_TIMEOUT,
+        limits=httpx.Limits(max_connections=OLLAMA_CONCURRENCY, max_keepalive_connections=OLLAMA_CONCURRENCY),
+    )
+    ollama_semaphore = asyncio.Semaphore(OLLAMA_CONCURRENCY)
+    await job_queue.start()
+    try:
+        yield
+    finally:
+        await job_queue.stop()
+        await ollama_client.aclose()
+        shutdown_executor()
+        ollama_client = None
+
+app = FastAPI(lifespan=lifespan)
+
+# Enable CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:5173"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Bump whenever the analysis prompt changes so stale cached results are not reused
+PROMPT_VERSION = 4
+SUMMARY_PROMPT_VERSION = 3
+
+# Token budgets for the map-reduce pipeline; tokens are estimated from characters
+CHARS_PER_TOKEN = 4
+CHUNK_TOKEN_BUDGET = int(os.environ.get('AUTODOC_CHUNK_TOKENS', '1500'))
+REDUCE_TOKEN_BUDGET = int(os.environ.get('AUTODOC_REDUCE_TOKENS', '2500'))
+MAX_REDUCE_ROUNDS = 4
+
+# Outlines up to this size are used as file summaries as-is, without a model call
+OUTLINE_SUMMARY_TOKENS = int(os.environ.get('AUTODOC_OUTLINE_TOKENS', '200'))
+IMPORT_GRAPH_TOKEN_BUDGET = REDUCE_TOKEN_BUDGET // 2
+
+# Worker processes used to parse source files for the code index
+INDEX_WORKERS = int(os.environ.get('AUTODOC_INDEX_WORKERS', str(os.cpu_count() or 1)))
+
+CACHE_DIR = os.environ.get('AUTODOC_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.autodoc_cache'))
+analysis_cache = AnalysisCache(CACHE_DIR)
+pipeline_metrics = PipelineMetrics()
+project_manifests = ProjectManifests(CACHE_DIR)
+
+# Above this share of changed source files a project is re-analyzed from scratch
+INCREMENTAL_MAX_CHANGE_RATIO = float(os.environ.get('AUTODOC_INCREMENTAL_MAX_CHANGE', '0.3'))
+
+# Comprehensive mapping of file types to their categories
+FILE_TYPES = {
+    'python': ['.py', '.pyi', '.pyx', '.pyw'],
+    'javascript': ['.js', '.jsx', '.mjs', '.cjs'],
+    'typescript': ['.ts', '.tsx'],
+    'web': ['.html', '.htm', '.css', '.scss', '.sass', '.less', '.svg', '.vue', '.svelte'],
+    'java': ['.java', '.jar', '.class', '.jsp'],
+    'c_cpp': ['.c', '.cpp', '.h', '.hpp', '.cc'],
+    'c_sharp': ['.cs', '.cshtml', '.csx'],
+    'ruby': ['.rb', '.erb', '.gemspec', '.rake'],
+    'php': ['.php', '.phtml', '.php4', '.php5'],
+    'swift': ['.swift'],
+    'go': ['.go'],
+    'rust': ['.rs', '.rlib'],
+    'kotlin': ['.kt', '.kts'],
+    'scala': ['.scala'],
+    'config': [
+        '.json', '.yaml', '.yml', '.toml', '.ini', '.conf',
+        '.config', '.xml', '.xsd', '.wsdl', '.properties'
+    ],
+    'docker': ['Dockerfile', '.dockerignore', 'docker-compose.yml'],
+    'database': ['.sql', '.prisma', '.graphql', '.gql'],
+    'documentation': ['.md', '.rst', '.txt', '.docx'],
+    'shell': ['.sh', '.bash', '.zsh', '.fish', '.bat', '.cmd', '.ps1'],
+    'build': [
+        'package.json', 'requirements.txt', 'setup.py',
+        'pom.xml', 'build.gradle', 'build.sbt',
+        'Makefile', 'CMakeLists.txt'
+    ]
+}
+
+FILE_SUMMARY_PROMPT = """Summarize each of the following source file outlines (imports, classes, function signatures and docstrings) for a technical documentation writer.
+For every file, start with a line `File: <name>` exactly as given below, followed by a few concise lines covering
+its purpose, main classes and functions, external libraries used and how it interacts with other files.
+
+{files}
+"""
+
+MODULE_SUMMARY_PROMPT = """Condense the following file summaries into one concise summary of this part of the project.
+Keep the names of important files, components, technologies and how they interact.
+
+{summaries}
+"""
+
+ARCHITECTURE_PROMPT = """Provide a comprehensive architectural analysis for this project. Project File Composition:
+
+        File Summaries:
+        {file_summaries}
+
+        Module Dependencies (file -> imported project files; external packages):
+        {import_graph}
+        {file_types_str}
+        Analyze this project and provide a clear, detailed technical documentation with the following sections. For each section, provide detailed, specific information based on the actual code and files:
+        1. Project Architecture:
+            - How are the components organized?
+            - What are the key architectural decisions?
+
+        2. Project Overview:
+            - What is the main purpose of this project?
+            - What problem does it solve?
+            - What are its core features?
+
+        3. Tech Stack:
+            - List all major technologies, frameworks, and libraries used
+            - Explain why each technology was chosen
+            - Describe version requirements if specified
+
+        4. Key Features in Components:
+            - Detail the main components and their responsibilities
+            - Explain how components interact
+            - Describe key functionality implemented in each major component
+
+        5. Implementation Flow:
+            - Explain the main workflow of the application
+            - Describe how data flows between components
+            - Detail key processes and their steps
+
+        6. Future Improvements:
+            - Suggest specific technical improvements
+            - Identify potential optimizations
+            - Recommend scalability enhancements
+
+        Format each section clearly with detailed, specific information. Avoid generalities and focus on the actual implementation details found in the code.
+        """
+
+INCREMENTAL_PROMPT = """The following documentation sections were written for a project before its latest changes.
+
+        Previous Sections:
+        {previous_sections}
+
+        Changed Files:
+        {changes}
+
+        Summaries of Added and Modified Files:
+        {file_summaries}
+        {file_types_str}
+        Rewrite only the sections below so they reflect the changes. Keep everything that is still accurate, remove references to deleted files and describe new or modified components with specific details from the summaries. Use exactly these numbered headers:
+        {sections}
+        """
+
+# Directories that are never descended into while walking a project
+EXCLUDED_DIRS = {'venv', '.venv', 'node_modules', '__pycache__', '.git'}
+
+# Extension-less file names that are still counted as project files
+EXTENSIONLESS_FILES = {'Dockerfile', 'Makefile'}
+
+# Source files that are indexed and described to the model
+SOURCE_EXTENSIONS = PYTHON_EXTENSIONS | SCRIPT_EXTENSIONS
+SOURCE_FILE_NAMES = {'Dockerfile', 'Makefile'}
+
+# Source files whose changes affect the Tech Stack section
+DEPENDENCY_FILE_NAMES = {'Dockerfile', 'Makefile', 'setup.py'}
+
+def _build_file_type_lookup() -> tuple:
+    """Flatten FILE_TYPES into extension and file name lookup tables.
+
+    Each entry maps to (priority, category) so that, like the original linear
+    scan over FILE_TYPES, the category declared first wins when both the
+    extension and the full file name match.
+    """
+    by_extension = {}
+    by_name = {}
+    for priority, (type_name, extensions) in enumerate(FILE_TYPES.items()):
+        for entry in extensions:
+            table = by_extension if entry.startswith('.') else by_name
+            table.setdefault(entry, (priority, type_name))
+    # Dotfiles such as .dockerignore have no suffix, so they match by name
+    for entry, value in list(by_extension.items()):
+        by_name.setdefault(entry, value)
+    return by_extension, by_name
+
+FILE_TYPE_BY_EXTENSION, FILE_TYPE_BY_NAME = _build_file_type_lookup()
+
+def categorize_file(file_name: str) -> str:
+    """Return the FILE_TYPES category for a file name, or 'other'."""
+    file_ext = os.path.splitext(file_name)[1].lower()
+    candidates = [
+        match for match in (FILE_TYPE_BY_EXTENSION.get(file_ext), FILE_TYPE_BY_NAME.get(file_name))
+        if match
+    ]
+    if not candidates:
+        return 'other'
+    return min(candidates)[1]
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a .gitignore glob into a regular expression."""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+            continue
+        if char == '*':
+            regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            close = pattern.find(']', i + 1)
+            if close == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = close
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
+
+def load_gitignore(directory: str, base: str) -> list:
+    """Parse the .gitignore in `directory` into (base, regex, negate, dir_only) rules.
+
+    `base` is the directory's path relative to the walk root ('' for the root).
+    """
+    rules = []
+    try:
+        with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return rules
+
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # Patterns containing a slash are anchored to the .gitignore directory,
+        # everything else matches the entry name at any depth below it
+        anchored = '/' in line
+        line = line.lstrip('/')
+        regex = _glob_to_regex(line)
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        rules.append((base, re.compile(regex + '$'), negate, dir_only))
+    return rules
+
+def is_ignored(rel_path: str, is_dir: bool, rules: list) -> bool:
+    """Apply gitignore rules in order; the last matching rule decides."""
+    ignored = False
+    for base, regex, negate, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if base:
+            if not rel_path.startswith(base + '/'):
+                continue
+            subject = rel_path[len(base) + 1:]
+        else:
+            subject = rel_path
+        if regex.match(subject):
+            ignored = not negate
+    return ignored
+
+def iter_project_files(source_path: str):
+    """Yield project file paths using a single streaming os.scandir walk.
+
+    Excluded directories and .gitignore matches are pruned before they are
+    descended into, so large dependency trees are never listed.
+    """
+    stack = [(source_path, '', load_gitignore(source_path, ''))]
+    while stack:
+        directory, rel_dir, rules = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            print(f"Error reading directory {directory}: {str(e)}")
+            continue
+
+        with entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in EXCLUDED_DIRS or is_ignored(rel_path, True, rules):
+                            continue
+                        stack.append((entry.path, rel_path, rules + load_gitignore(entry.path, rel_path)))
+                    elif entry.is_file():
+                        if '.' not in entry.name and entry.name not in EXTENSIONLESS_FILES:
+                            continue
+                        if is_ignored(rel_path, False, rules):
+                            continue
+                        yield entry.path
+                except OSError as e:
+                    print(f"Error reading {entry.path}: {str(e)}")
+
+def is_source_file(file_path: str) -> bool:
+    """Whether a file is indexed and described to the model."""
+    return (os.path.splitext(file_path)[1].lower() in SOURCE_EXTENSIONS
+            or os.path.basename(file_path) in SOURCE_FILE_NAMES)
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (roughly four characters per token for code)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def split_text(text: str, token_budget: int) -> list:
+    """Split text on line boundaries into pieces that fit the token budget."""
+    max_chars = token_budget * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    current = ''
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if len(current) + len(line) > max_chars:
+            pieces.append(current)
+            current = ''
+        current += line
+    if current:
+        pieces.append(current)
+    return pieces
+
+def iter_source_chunks(items, token_budget: int):
+    """Yield chunks of (file_path, label, text) pieces that fit the token budget.
+
+    `items` yields (file_path, rel_path, text); texts larger than the budget
+    are split into labelled parts.
+    """
+    chunk = []
+    chunk_tokens = 0
+    for file_path, rel_path, text in items:
+        pieces = split_text(text, token_budget)
+        for index, piece in enumerate(pieces):
+            label = rel_path if len(pieces) == 1 else f"{rel_path} (part {index + 1}/{len(pieces)})"
+            tokens = estimate_tokens(piece)
+            if chunk and chunk_tokens + tokens > token_budget:
+                yield chunk
+                chunk = []
+                chunk_tokens = 0
+            chunk.append((file_path, label, piece))
+            chunk_tokens += tokens
+    if chunk:
+        yield chunk
+
+# Matches `File: <label>` headers, including Markdown headings, bullets and bold
+FILE_HEADER_RE = re.compile(r'^\s*(?:[#>*-]+\s*)?\**\s*File:\s*(.+?)\s*$')
+
+def parse_file_summaries(summary_text: str, labels: list) -> dict:
+    """Split a chunk summary into per-label summaries using its `File:` headers."""
+    summaries = {}
+    current_label = None
+    for line in summary_text.split('\n'):
+        header_match = FILE_HEADER_RE.match(line)
+        # Models wrap the label (or only the path in it) in backticks or bold
+        label = header_match and header_match.group(1).replace('`', '').replace('*', '').strip()
+        if label in labels:
+            current_label = label
+            summaries.setdefault(current_label, [])
+        elif current_label and line.strip():
+            summaries[current_label].append(line.strip())
+
+    if not summaries and len(labels) == 1:
+        return {labels[0]: summary_text.strip()}
+    return {label: '\n'.join(lines) for label, lines in summaries.items()}
+
+def summary_cache_key(file_hash: str) -> str:
+    return hashlib.sha256(f"{file_hash}:{OLLAMA_MODEL}:{SUMMARY_PROMPT_VERSION}".encode('utf-8')).hexdigest()
+
+def _lookup_cached_summaries(file_paths: list) -> tuple:
+    """Split files into cached summaries and files still pending summarization."""
+    summaries = {}
+    pending = []
+    file_keys = {}
+    for file_path, file_hash in analysis_cache.file_hashes(file_paths).items():
+        file_keys[file_path] = summary_cache_key(file_hash)
+        cached = analysis_cache.get_summary(file_keys[file_path])
+        if cached is not None:
+            summaries[file_path] = cached
+        else:
+            pending.append(file_path)
+    return summaries, pending, file_keys
+
+async def summarize_chunk(chunk: list) -> list:
+    """Summarize one chunk and return (file_path, summary) pairs for its pieces.
+
+    Pieces whose `File:` header the model skipped are summarized again on
+    their own; the summary is None if that also produced nothing.
+    """
+    labels = [label for _, label, _ in chunk]
+    prompt = FILE_SUMMARY_PROMPT.format(files="\n".join(
+        f"File: {label}\n{text}" for _, label, text in chunk
+    ))
+    chunk_summary = await generate_with_ollama(prompt)
+    parsed = parse_file_summaries(chunk_summary, labels)
+    skipped = [piece for piece in chunk if not parsed.get(piece[1])]
+    if skipped and len(chunk) > 1:
+        pipeline_metrics.count('summary_retries', len(skipped))
+        for retried in await asyncio.gather(*(summarize_chunk([piece]) for piece in skipped)):
+            for (_, label, _), (_, summary) in zip(skipped, retried):
+                parsed[label] = summary
+    return [(file_path, parsed.get(label) or None) for file_path, label, _ in chunk]
+
+async def summarize_source_files(source_path: str, outlines: dict, report=None) -> list:
+    """Map step: summarize file outlines chunk by chunk, reusing cached per-file summaries.
+
+    `outlines` maps each file path to its code index outline (see
+    index_source_files), which is sent instead of the full source; outlines
+    small enough are used as the summary directly. Up to
+    OLLAMA_CONCURRENCY chunks are summarized in parallel; the chunk iterator
+    is only advanced as slots free up so memory stays bounded.
+    `report(**counters)`, if given, receives progress updates.
+    """
+    summaries = {
+        file_path: outline for file_path, outline in outlines.items()
+        if estimate_tokens(outline) <= OUTLINE_SUMMARY_TOKENS
+    }
+    cached, pending, file_keys = await asyncio.to_thread(
+        _lookup_cached_summaries, [file_path for file_path in outlines if file_path not in summaries]
+    )
+    summaries.update(cached)
+    if report:
+        report(files_cached=len(summaries), files_to_summarize=len(pending), chunks_summarized=0)
+
+    part_summaries = {}
+    chunks = iter_source_chunks(
+        ((file_path, os.path.relpath(file_path, source_path), outlines[file_path]) for file_path in pending),
+        CHUNK_TOKEN_BUDGET
+    )
+    in_flight = []
+    results = []
+    while True:
+        while len(in_flight) < OLLAMA_CONCURRENCY:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            # Tasks are kept in submission order so multi-part files are reassembled in order
+            in_flight.append(asyncio.create_task(summarize_chunk(chunk)))
+        if not in_flight:
+            break
+        try:
+            results.append(await in_flight.pop(0))
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            raise
+        if report:
+            report(chunks_summarized=len(results))
+
+    for chunk_result in results:
+        for file_path, summary in chunk_result:
+            part_summaries.setdefault(file_path, []).append(summary)
+
+    new_summaries = {}
+    for file_path in pending:
+        parts = part_summaries.get(file_path, [])
+        if not any(parts):
+            continue
+        summary = '\n'.join(part for part in parts if part)
+        summaries[file_path] = summary
+        # Files the model did not fully summarize are used for this run only
+        if all(parts):
+            new_summaries[file_keys[file_path]] = summary
+    await asyncio.to_thread(analysis_cache.put_summaries, new_summaries)
+
+    return [
+        (os.path.relpath(file_path, source_path), summaries[file_path])
+        for file_path in outlines if file_path in summaries
+    ]
+
+async def reduce_summaries(summaries: list) -> str:
+    """Collapse file summaries into module summaries until they fit the reduce budget."""
+    entries = [f"File: {label}\n{summary}" for label, summary in summaries]
+    for _ in range(MAX_REDUCE_ROUNDS):
+        combined = "\n\n".join(entries)
+        if estimate_tokens(combined) <= REDUCE_TOKEN_BUDGET:
+            return combined
+
+        groups = []
+        group = []
+        group_tokens = 0
+        for entry in entries:
+            for piece in split_text(entry, CHUNK_TOKEN_BUDGET):
+                tokens = estimate_tokens(piece)
+                if group and group_tokens + tokens > CHUNK_TOKEN_BUDGET:
+                    groups.append(group)
+                    group = []
+                    group_tokens = 0
+                group.append(piece)
+                group_tokens += tokens
+        if group:
+            groups.append(group)
+
+        # The semaphore in generate_with_ollama bounds how many of these run at once
+        group_summaries = await asyncio.gather(*[
+            generate_with_ollama(MODULE_SUMMARY_PROMPT.format(summaries="\n\n".join(group)))
+            for group in groups
+        ])
+        entries = [
+            f"Module group {index + 1}:\n" + summary.strip()
+            for index, summary in enumerate(group_summaries)
+        ]
+
+    # Give up shrinking and keep what fits rather than overflowing the context window
+    return "\n\n".join(entries)[:REDUCE_TOKEN_BUDGET * CHARS_PER_TOKEN]
+
+async def generate_with_ollama(prompt: str) -> str:
+    """Run a single non-streaming completion on the shared Ollama client.
+
+    Calls are bounded by OLLAMA_CONCURRENCY and retried with exponential
+    backoff on connection errors, timeouts and 5xx responses.
+    """
+    pipeline_metrics.count('ollama_calls')
+    pipeline_metrics.count('prompt_bytes', len(prompt.encode('utf-8')))
+    pipeline_metrics.count('prompt_tokens_estimated', estimate_tokens(prompt))
+    async with ollama_semaphore:
+        with pipeline_metrics.stage('ollama'):
+            for attempt in range(OLLAMA_MAX_RETRIES + 1):
+                try:
+                    response = await ollama_client.post(OLLAMA_URL, 
+                        json={
+                            "model": OLLAMA_MODEL,
+                            "prompt": prompt,
+                            "stream": False
+                        })
+                    if response.status_code < 500:
+                        response.raise_for_status()
+                        result = response.json()
+                        pipeline_metrics.count('response_bytes', len(result.get('response', '').encode('utf-8')))
+                        return result.get('response', '')
+                    error = httpx.HTTPStatusError(
+                        f"Ollama returned {response.status_code}", request=response.request, response=response
+                    )
+                except httpx.TransportError as e:
+                    error = e
+                if attempt == OLLAMA_MAX_RETRIES:
+                    raise error
+                print(f"Ollama request failed ({str(error)}), retrying")
+                await asyncio.sleep(OLLAMA_RETRY_BACKOFF * 2 ** attempt)
+
+async def stream_with_ollama(prompt: str):
+    """Stream completion tokens from Ollama as they are generated.
+
+    Shares the client, concurrency limit and retry policy of
+    generate_with_ollama; retries stop once the first token has been yielded.
+    """
+    pipeline_metrics.count('ollama_calls')
+    pipeline_metrics.count('prompt_bytes', len(prompt.encode('utf-8')))
+    pipeline_metrics.count('prompt_tokens_estimated', estimate_tokens(prompt))
+    async with ollama_semaphore:
+        # The stage only covers time spent on Ollama: time the consumer keeps
+        # this generator suspended at a yield is not counted
+        ollama_seconds = 0.0
+        resumed = time.perf_counter()
+        request_start = resumed
+        try:
+            for attempt in range(OLLAMA_MAX_RETRIES + 1):
+                started = False
+                try:
+                    async with ollama_client.stream('POST', OLLAMA_URL,
+                        json={
+                            "model": OLLAMA_MODEL,
+                            "prompt": prompt,
+                            "stream": True
+                        }) as response:
+                        if response.status_code < 500:
+                            response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                if not line.strip():
+                                    continue
+                                result = json.loads(line)
+                                if result.get('error'):
+                                    raise RuntimeError(result['error'])
+                                if not started:
+                                    pipeline_metrics.record('ollama_first_token', time.perf_counter() - request_start)
+                                started = True
+                                pipeline_metrics.count('response_bytes', len(result.get('response', '').encode('utf-8')))
+                                ollama_seconds += time.perf_counter() - resumed
+                                resumed = None
+                                yield result.get('response', '')
+                                resumed = time.perf_counter()
+                                if result.get('done'):
+                                    break
+                            return
+                        error = httpx.HTTPStatusError(
+                            f"Ollama returned {response.status_code}", request=response.request, response=response
+                        )
+                except httpx.TransportError as e:
+                    if started:
+                        raise
+                    error = e
+                if attempt == OLLAMA_MAX_RETRIES:
+                    raise error
+                print(f"Ollama request failed ({str(error)}), retrying")
+                await asyncio.sleep(OLLAMA_RETRY_BACKOFF * 2 ** attempt)
+        finally:
+            if resumed is not None:
+                ollama_seconds += time.perf_counter() - resumed
+            pipeline_metrics.record('ollama', ollama_seconds)
+
+# Matches numbered section headers such as "1. Project Architecture:"
+SECTION_HEADER_RE = re.compile(r'^(\d+\.\s*([^:]+)):')
+
+class SectionParser:
+    """Incrementally parse numbered `N. Section:` headers out of streamed text.
+
+    feed() and close() return the (section, content) pairs completed so far:
+    a section is complete once the next header arrives or the text ends.
+    """
+
+    def __init__(self):
+        self.sections = {}
+        self._current = None
+        self._buffer = ''
+
+    def feed(self, text: str) -> list:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split('\n')
+        completed = []
+        for line in lines:
+            completed.extend(self._parse_line(line))
+        return completed
+
+    def close(self) -> list:
+        completed = self._parse_line(self._buffer)
+        self._buffer = ''
+        completed.extend(self._finish_current())
+        self._current = None
+        return completed
+
+    def result(self) -> dict:
+        # Convert sections to dictionary with newline-joined text
+        return {
+            key: '\n'.join(value) for key, value in self.sections.items()
+        }
+
+    def _parse_line(self, line: str) -> list:
+        # Check for section headers
+        section_match = SECTION_HEADER_RE.match(line)
+        if section_match:
+            completed = self._finish_current()
+            self._current = section_match.group(2).strip()
+            self.sections[self._current] = []
+            return completed
+        if self._current and line.strip():
+            self.sections[self._current].append(line.strip())
+        return []
+
+    def _finish_current(self) -> list:
+        if self._current is None:
+            return []
+        return [(self._current, '\n'.join(self.sections[self._current]))]
+
+def parse_sections(analysis_text: str) -> dict:
+    """Parse numbered `N. Section:` headers into a section -> text dictionary."""
+    with pipeline_metrics.stage('section_parsing'):
+        parser = SectionParser()
+        parser.feed(analysis_text)
+        parser.close()
+        return parser.result()
+
+def ollama_error_sections(error: Exception) -> dict:
+    """Placeholder sections returned when the analysis could not be generated."""
+    return {
+        "Project Architecture": f"Error generating architectural overview: {str(error)}",
+        "Project Overview": "Unable to generate overview",
+        "Tech Stack": "Unable to determine tech stack",
+        "Key Features in Components": "No components analysis available",
+        "Implementation Flow": "No implementation flow details",
+        "Future Improvements": "No improvement suggestions generated"
+    }
+
+async def prepare_architecture_analysis(source_path: str, source_files: list, file_types_found: dict) -> str:
+    """Compute the analysis cache key for a project."""
+    with pipeline_metrics.stage('hashing'):
+        return await asyncio.to_thread(
+            analysis_cache.build_key, source_path, source_files, file_types_found, OLLAMA_MODEL, PROMPT_VERSION
+        )
+
+def total_file_size(file_paths: list) -> int:
+    """Sum the sizes of the given files, skipping any that have disappeared."""
+    total = 0
+    for file_path in file_paths:
+        try:
+            total += os.path.getsize(file_path)
+        except OSError:
+            pass
+    return total
+
+def _build_measured_code_index(source_path: str, source_files: list, with_import_graph: bool) -> tuple:
+    code_index = build_code_index(source_path, source_files, analysis_cache, INDEX_WORKERS)
+    outlines = {}
+    for file_path in source_files:
+        entry = code_index.get(os.path.relpath(file_path, source_path).replace(os.sep, '/'))
+        if entry is not None:
+            outlines[file_path] = format_outline(entry)
+    import_graph = None
+    if with_import_graph:
+        import_graph = format_import_graph(build_import_graph(code_index))
+        import_graph = split_text(import_graph, IMPORT_GRAPH_TOKEN_BUDGET)[0] if import_graph else None
+    return outlines, import_graph, total_file_size(source_files)
+
+async def index_source_files(source_path: str, source_files: list, with_import_graph: bool = True) -> tuple:
+    """Index `source_files`, recording source reading metrics.
+
+    Returns the outline of every indexed file keyed by path and the import
+    graph text truncated to IMPORT_GRAPH_TOKEN_BUDGET (None when it is empty
+    or not requested).
+    """
+    with pipeline_metrics.stage('source_reading'):
+        # Outlines, the import graph and file sizes are all built in the same
+        # worker thread so none of it runs on the event loop
+        outlines, import_graph, source_bytes = await asyncio.to_thread(
+            _build_measured_code_index, source_path, source_files, with_import_graph
+        )
+    pipeline_metrics.count('source_files_indexed', len(outlines))
+    pipeline_metrics.count('source_bytes', source_bytes)
+    return outlines, import_graph
+
+def format_file_types(file_types_found: dict) -> str:
+    return "File Types Distribution:\n" + "\n".join([
+            f"- {ftype}: {count} files" 
+            for ftype, count in file_types_found.items()
+        ])
+
+async def build_architecture_prompt(file_summaries: list, file_types_found: dict, import_graph) -> str:
+    """Condense the per-file summaries and build the final architecture prompt."""
+    return ARCHITECTURE_PROMPT.format(
+        file_summaries=await reduce_summaries(file_summaries),
+        import_graph=import_graph or 'None',
+        file_types_str=format_file_types(file_types_found)
+    )
+
+def hash_source_files(source_path: str, source_files: list) -> dict:
+    """Map each source file's path relative to the project to its content hash."""
+    return {
+        os.path.relpath(file_path, source_path): file_hash
+        for file_path, file_hash in analysis_cache.file_hashes(source_files).items()
+    }
+
+def plan_incremental_update(manifest: dict, file_hashes: dict, file_types_found: dict):
+    """Decide whether the previous analysis can be updated in place.
+
+    Returns (changes, affected_sections), or None when a full analysis is
+    needed: no usable manifest, a different model or prompt version, or too
+    large a share of the project changed.
+    """
+    if not manifest or not manifest.get('architecture_analysis'):
+        return None
+    if manifest.get('model') != OLLAMA_MODEL or manifest.get('prompt_version') != PROMPT_VERSION:
+        return None
+
+    changes = diff_files(manifest.get('files', {}), file_hashes)
+    changed = set(changes['added']) | set(changes['modified']) | set(changes['deleted'])
+    if len(changed) > INCREMENTAL_MAX_CHANGE_RATIO * max(len(file_hashes), 1):
+        return None
+    previous_summaries = manifest.get('summaries', {})
+    if any(path not in previous_summaries for path in file_hashes if path not in changed):
+        return None
+
+    affected = set()
+    if changes['added'] or changes['deleted']:
+        affected.update(['Project Architecture', 'Key Features in Components', 'Implementation Flow'])
+    if changes['modified']:
+        affected.update(['Key Features in Components', 'Implementation Flow'])
+    if any(os.path.basename(path) in DEPENDENCY_FILE_NAMES for path in changed):
+        affected.add('Tech Stack')
+    if file_types_found != manifest.get('file_types_found'):
+        affected.update(['Project Architecture', 'Tech Stack'])
+    # Only regenerate sections the previous analysis actually produced
+    affected = [section for section in manifest['architecture_analysis'] if section in affected]
+    return changes, affected
+
+async def update_sections_incrementally(previous_sections: dict, changes: dict, affected: list,
+                                        changed_summaries: list, file_types_found: dict) -> dict:
+    """Regenerate only the affected sections and merge them into the previous analysis."""
+    merged = dict(previous_sections)
+    if not affected:
+        return merged
+
+    change_lines = [f"Added: {path}" for path in changes['added']]
+    change_lines += [f"Modified: {path}" for path in changes['modified']]
+    change_lines += [f"Deleted: {path}" for path in changes['deleted']]
+    prompt = INCREMENTAL_PROMPT.format(
+        previous_sections="\n\n".join(
+            f"{index + 1}. {section}:\n{previous_sections[section]}" for index, section in enumerate(affected)
+        ),
+        changes="\n".join(change_lines),
+        file_summaries=await reduce_summaries(changed_summaries),
+        file_types_str=format_file_types(file_types_found),
+        sections="\n".join(f"{index + 1}. {section}:" for index, section in enumerate(affected)),
+    )
+    updated = parse_sections(await generate_with_ollama(prompt))
+    for section in affected:
+        if updated.get(section):
+            merged[section] = updated[section]
+    return merged
+
+async def analyze_architecture_with_ollama(source_path: str, file_types_found: dict, source_files: list,
+                                           force_refresh: bool = False) -> dict:
+    """Generate a comprehensive architectural overview using Ollama.
+
+    Source files are summarized in token-budgeted chunks (map), the summaries
+    are condensed until they fit the context window, and a final prompt
+    produces the six documentation sections (reduce).
+    """
+    try:
+        formatted_sections = {}
+        async for section, content in stream_architecture_analysis(
+            source_path, file_types_found, source_files, force_refresh=force_refresh
+        ):
+            formatted_sections[section] = content
+        return formatted_sections
+    except Exception as e:
+        print(f"Error with Ollama: {str(e)}")
+        return ollama_error_sections(e)
+
+async def stream_architecture_analysis(source_path: str, file_types_found: dict, source_files: list,
+                                      force_refresh: bool = False, report=None):
+    """Yield (section, content) pairs as soon as each section has been generated.
+
+    When the project manifest from the previous run allows it, only changed
+    files are re-summarized and only the affected sections are regenerated.
+    """
+    cache_key = await prepare_architecture_analysis(source_path, source_files, file_types_found)
+    if not force_refresh:
+        cached_sections = await asyncio.to_thread(analysis_cache.get, cache_key)
+        if cached_sections is not None:
+            pipeline_metrics.count('analysis_cache_hits')
+            for section in cached_sections.items():
+                yield section
+            return
+    pipeline_metrics.count('analysis_cache_misses')
+
+    file_hashes = await asyncio.to_thread(hash_source_files, source_path, source_files)
+    manifest = None if force_refresh else await asyncio.to_thread(project_manifests.load, source_path)
+    plan = await asyncio.to_thread(plan_incremental_update, manifest, file_hashes, file_types_found)
+
+    if plan:
+        changes, affected = plan
+        if report:
+            report(files_changed=sum(len(paths) for paths in changes.values()), sections_affected=len(affected))
+        changed_files = [
+            os.path.join(source_path, path) for path in changes['added'] + changes['modified']
+        ]
+        outlines, _ = await index_source_files(source_path, changed_files, with_import_graph=False)
+        with pipeline_metrics.stage('prompt_building'):
+            changed_summaries = await summarize_source_files(source_path, outlines, report=report)
+            file_summaries = {
+                path: summary for path, summary in manifest['summaries'].items() if path in file_hashes
+            }
+            file_summaries.update(changed_summaries)
+            formatted_sections = await update_sections_incrementally(
+                manifest['architecture_analysis'], changes, affected, changed_summaries, file_types_found
+            )
+        for section in formatted_sections.items():
+            yield section
+    else:
+        outlines, import_graph = await index_source_files(source_path, source_files)
+        if report:
+            report(files_indexed=len(outlines))
+        with pipeline_metrics.stage('prompt_building'):
+            summaries = await summarize_source_files(source_path, outlines, report=report)
+            file_summaries = dict(summaries)
+            prompt = await build_architecture_prompt(summaries, file_types_found, import_graph)
+        parser = SectionParser()
+        parse_seconds = 0.0
+        async for token in stream_with_ollama(prompt):
+            parse_start = time.perf_counter()
+            completed = parser.feed(token)
+            parse_seconds += time.perf_counter() - parse_start
+            for section in completed:
+                yield section
+        parse_start = time.perf_counter()
+        completed = parser.close()
+        formatted_sections = parser.result()
+        pipeline_metrics.record('section_parsing', parse_seconds + time.perf_counter() - parse_start)
+        for section in completed:
+            yield section
+
+    if formatted_sections:
+        # Failing to persist must not discard a successful generation
+        try:
+            await asyncio.to_thread(analysis_cache.put, cache_key, formatted_sections)
+        except Exception as e:
+            print(f"Error caching analysis for {source_path}: {str(e)}")
+        try:
+            await asyncio.to_thread(project_manifests.save, source_path, {
+                'model': OLLAMA_MODEL,
+                'prompt_version': PROMPT_VERSION,
+                'files': file_hashes,
+                'summaries': file_summaries,
+                'file_types_found': file_types_found,
+                'architecture_analysis': formatted_sections,
+            })
+        except Exception as e:
+            print(f"Error saving manifest for {source_path}: {str(e)}")
+
+@app.post("/analyze-folder")
+async def analyze_folder(request: FolderRequest):
+    source_path = str(pathlib.Path(request.source_path).resolve())
+    
+    if not os.path.exists(source_path):
+        raise HTTPException(status_code=404, detail=f"Source folder not found: {source_path}")
+    
+    try:
+        with pipeline_metrics.track_request() as request_metrics, pipeline_metrics.stage('analyze_folder'):
+            # Collect and categorize files
+            file_types_found, source_files = await asyncio.to_thread(analyze_files, source_path)
+            
+            # Generate architectural analysis
+            architecture_analysis = await analyze_architecture_with_ollama(
+                source_path, file_types_found, source_files, force_refresh=request.force_refresh
+            )
+        
+        response = {
+            "architecture_analysis": architecture_analysis,
+            "file_types_found": file_types_found,
+            "total_files": sum(file_types_found.values())
+        }
+        if request.include_metrics:
+            response["metrics"] = request_metrics
+        return response
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing folder: {str(e)}")
+
+async def run_analysis_job(source_path: str, force_refresh: bool, report) -> dict:
+    """Background job runner producing the same result as /analyze-folder."""
+    file_types_found, source_files = await asyncio.to_thread(analyze_files, source_path)
+    report(files_scanned=sum(file_types_found.values()))
+
+    architecture_analysis = {}
+    async for section, content in stream_architecture_analysis(
+        source_path, file_types_found, source_files, force_refresh=force_refresh, report=report
+    ):
+        architecture_analysis[section] = content
+        report(sections_generated=len(architecture_analysis))
+
+    return {
+        "architecture_analysis": architecture_analysis,
+        "file_types_found": file_types_found,
+        "total_files": sum(file_types_found.values())
+    }
+
+job_queue = JobQueue(JobStore(CACHE_DIR), run_analysis_job, workers=JOB_WORKERS)
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: FolderRequest):
+    """Queue a background analysis; identical in-flight requests share one job."""
+    source_path = str(pathlib.Path(request.source_path).resolve())
+    
+    if not os.path.exists(source_path):
+        raise HTTPException(status_code=404, detail=f"Source folder not found: {source_path}")
+
+    return await job_queue.submit(source_path, request.force_refresh)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return the status, progress and (once completed) result of a job."""
+    job = await asyncio.to_thread(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+@app.post("/analyze-folder/stream")
+async def analyze_folder_stream(request: FolderRequest):
+    """Streaming variant of /analyze-folder that emits NDJSON events.
+
+    File-type counts are sent as soon as the walk finishes, followed by one
+    `section` event per documentation section as it completes.
+    """
+    source_path = str(pathlib.Path(request.source_path).resolve())
+    
+    if not os.path.exists(source_path):
+        raise HTTPException(status_code=404, detail=f"Source folder not found: {source_path}")
+
+    def event(payload: dict) -> str:
+        return json.dumps(payload) + "\n"
+
+    async def events():
+        try:
+            file_types_found, source_files = await asyncio.to_thread(analyze_files, source_path)
+            yield event({
+                "event": "file_types",
+                "file_types_found": file_types_found,
+                "total_files": sum(file_types_found.values())
+            })
+
+            async for section, content in stream_architecture_analysis(
+                source_path, file_types_found, source_files, force_refresh=request.force_refresh
+            ):
+                yield event({"event": "section", "section": section, "content": content})
+
+            yield event({"event": "done"})
+        except Exception as e:
+            print(f"Error streaming analysis: {str(e)}")
+            yield event({"event": "error", "detail": f"Error processing folder: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.get("/metrics")
+async def get_metrics():
+    """Report cumulative per-stage timings and byte/token counters."""
+    return dict(pipeline_metrics.snapshot(), cache=await asyncio.to_thread(analysis_cache.stats))
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Report analysis cache hit/miss counts and occupancy."""
+    return await asyncio.to_thread(analysis_cache.stats)
+
+SECTION_ICONS = {
+    'Project Architecture': '🏗️',
+    'Project Overview': '📋',
+    'Tech Stack': '💻',
+    'Key Features in Components': '🧩',
+    'Implementation Flow': '🔀',
+    'Future Improvements': '🚀',
+}
+DEFAULT_SECTION_ICON = '📝'
+FILE_COMPOSITION_ICON = '📊'
+
+def get_section_icon(section: str) -> str:
+    """Return the appropriate icon for each documentation section."""
+    return SECTION_ICONS.get(section, DEFAULT_SECTION_ICON)
+
+# Rendered PDFs are cached in memory by a hash of the documentation content
+PDF_CACHE_SIZE = int(os.environ.get('AUTODOC_PDF_CACHE_SIZE', '32'))
+PDF_CHUNK_SIZE = 64 * 1024
+
+# The standard PDF fonts have no emoji glyphs and no emoji font can be relied
+# on across platforms, so each icon is drawn as a small monochrome vector
+# glyph in a unit square scaled to the heading size
+def _draw_building_icon(canvas):
+    canvas.rect(0.2, 0, 0.6, 0.8, fill=0)
+    canvas.line(0.5, 0.8, 0.5, 1)
+    for y in (0.15, 0.4, 0.6):
+        canvas.rect(0.32, y, 0.1, 0.1, stroke=0, fill=1)
+        canvas.rect(0.58, y, 0.1, 0.1, stroke=0, fill=1)
+
+def _draw_clipboard_icon(canvas):
+    canvas.roundRect(0.15, 0, 0.7, 0.9, 0.08, fill=0)
+    canvas.rect(0.35, 0.82, 0.3, 0.16, stroke=0, fill=1)
+    for y in (0.6, 0.42, 0.24):
+        canvas.line(0.3, y, 0.7, y)
+
+def _draw_laptop_icon(canvas):
+    canvas.roundRect(0.15, 0.3, 0.7, 0.55, 0.05, fill=0)
+    canvas.rect(0, 0.12, 1, 0.1, stroke=0, fill=1)
+
+def _draw_components_icon(canvas):
+    for x, y in ((0.05, 0.05), (0.55, 0.05), (0.05, 0.55), (0.55, 0.55)):
+        canvas.rect(x, y, 0.4, 0.4, fill=0)
+    canvas.rect(0.6, 0.6, 0.3, 0.3, stroke=0, fill=1)
+
+def _draw_flow_icon(canvas):
+    canvas.line(0, 0.25, 0.8, 0.75)
+    canvas.line(0, 0.75, 0.8, 0.25)
+    for y in (0.25, 0.75):
+        path = canvas.beginPath()
+        path.moveTo(1, y)
+        path.lineTo(0.75, y + 0.15)
+        path.lineTo(0.75, y - 0.15)
+        path.close()
+        canvas.drawPath(path, stroke=0, fill=1)
+
+def _draw_rocket_icon(canvas):
+    body = canvas.beginPath()
+    body.moveTo(0.5, 1)
+    body.curveTo(0.75, 0.8, 0.7, 0.45, 0.65, 0.25)
+    body.lineTo(0.35, 0.25)
+    body.curveTo(0.3, 0.45, 0.25, 0.8, 0.5, 1)
+    body.close()
+    canvas.drawPath(body, fill=0)
+    canvas.circle(0.5, 0.6, 0.08, stroke=0, fill=1)
+    for side in (-1, 1):
+        fin = canvas.beginPath()
+        fin.moveTo(0.5 + side * 0.17, 0.45)
+        fin.lineTo(0.5 + side * 0.32, 0.15)
+        fin.lineTo(0.5 + side * 0.15, 0.25)
+        fin.close()
+        canvas.drawPath(fin, stroke=0, fill=1)
+    canvas.line(0.5, 0.2, 0.5, 0)
+
+def _draw_document_icon(canvas):
+    page = canvas.beginPath()
+    page.moveTo(0.15, 0)
+    page.lineTo(0.85, 0)
+    page.lineTo(0.85, 0.7)
+    page.lineTo(0.55, 1)
+    page.lineTo(0.15, 1)
+    page.close()
+    canvas.drawPath(page, fill=0)
+    for y in (0.7, 0.5, 0.3):
+        canvas.line(0.3, y, 0.7 if y < 0.7 else 0.45, y)
+
+def _draw_chart_icon(canvas):
+    canvas.line(0, 0, 1, 0)
+    for x, height in ((0.1, 0.45), (0.4, 0.9), (0.7, 0.65)):
+        canvas.rect(x, 0.05, 0.2, height, stroke=0, fill=1)
+
+PDF_ICON_DRAWERS = {
+    '🏗️': _draw_building_icon,
+    '📋': _draw_clipboard_icon,
+    '💻': _draw_laptop_icon,
+    '🧩': _draw_components_icon,
+    '🔀': _draw_flow_icon,
+    '🚀': _draw_rocket_icon,
+    DEFAULT_SECTION_ICON: _draw_document_icon,
+    FILE_COMPOSITION_ICON: _draw_chart_icon,
+}
+
+class IconHeading(Flowable):
+    """Section heading with a vector icon drawn in front of the title."""
+
+    def __init__(self, icon: str, paragraph: Paragraph, color):
+        super().__init__()
+        self.draw_icon = PDF_ICON_DRAWERS.get(icon, _draw_document_icon)
+        self.paragraph = paragraph
+        self.color = color
+        self.icon_size = paragraph.style.fontSize
+        self.gap = self.icon_size * 0.6
+
+    def wrap(self, availWidth, availHeight):
+        offset = self.icon_size + self.gap
+        self.width = availWidth
+        self.height = self.paragraph.wrap(availWidth - offset, availHeight)[1]
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.paragraph.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.paragraph.getSpaceAfter()
+
+    def draw(self):
+        canvas = self.canv
+        size = self.icon_size
+        canvas.saveState()
+        # Align the icon with the first line of the title
+        canvas.translate(0, self.height - self.paragraph.style.leading + (self.paragraph.style.leading - size) / 2)
+        canvas.scale(size, size)
+        canvas.setStrokeColor(self.color)
+        canvas.setFillColor(self.color)
+        canvas.setLineWidth(1.2 / size)
+        canvas.setLineJoin(1)
+        canvas.setLineCap(1)
+        self.draw_icon(canvas)
+        canvas.restoreState()
+        self.paragraph.drawOn(canvas, size + self.gap, 0)
+
+def _build_pdf_styles() -> dict:
+    """Paragraph and table styles and colours shared by every rendered PDF."""
+    base = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle('DocTitle', parent=base['Title'], fontSize=24, spaceAfter=24,
+                                textColor=colors.HexColor('#111827')),
+        'heading': ParagraphStyle('DocHeading', parent=base['Heading2'], fontSize=16, spaceBefore=12,
+                                  spaceAfter=8, textColor=colors.HexColor('#111827')),
+        'body': ParagraphStyle('DocBody', parent=base['BodyText'], fontSize=10, leading=14,
+                               textColor=colors.HexColor('#374151'), leftIndent=8, rightIndent=8,
+                               spaceBefore=0, spaceAfter=0),
+        'body_background': colors.HexColor('#f9fafb'),
+        'icon_color': colors.HexColor('#3b82f6'),
+        'table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3b82f6')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#e6f2ff')]),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ]),
+    }
+
+PDF_STYLES = _build_pdf_styles()
+
+pdf_cache = OrderedDict()
+pdf_cache_lock = threading.Lock()
+
+def _pdf_heading(icon: str, title: str) -> IconHeading:
+    return IconHeading(icon, Paragraph(escape(title), PDF_STYLES['heading']), PDF_STYLES['icon_color'])
+
+def render_documentation_pdf(data: dict) -> bytes:
+    """Render analysis results (as returned by /analyze-folder) into a PDF."""
+    architecture_analysis = data.get('architecture_analysis') or {}
+    file_types_found = data.get('file_types_found') or {}
+    total_files = sum(file_types_found.values()) or 1
+
+    story = [
+        Paragraph('Project Documentation', PDF_STYLES['title']),
+        _pdf_heading(FILE_COMPOSITION_ICON, 'Project File Composition'),
+    ]
+    rows = [['File Type', 'Files', 'Share']] + [
+        [file_type, str(count), f"{count / total_files * 100:.1f}%"]
+        for file_type, count in file_types_found.items()
+    ]
+    table = Table(rows, colWidths=[200, 80, 80], hAlign='LEFT')
+    table.setStyle(PDF_STYLES['table'])
+    story += [table, Spacer(1, 16)]
+
+    for section, content in architecture_analysis.items():
+        story.append(_pdf_heading(get_section_icon(section), section))
+        # One paragraph per line keeps layout linear in the section length;
+        # the frame background paints the box behind them across page breaks
+        story += [FrameBG(color=PDF_STYLES['body_background']), Spacer(1, 8)]
+        story += [Paragraph(escape(line) or '&nbsp;', PDF_STYLES['body']) for line in str(content).split('\n')]
+        story += [Spacer(1, 8), FrameBG(start=False), Spacer(1, 16)]
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, title='Project Documentation',
+                            leftMargin=54, rightMargin=54, topMargin=54, bottomMargin=54)
+    doc.build(story)
+    return buffer.getvalue()
+
+def get_documentation_pdf(data: dict) -> bytes:
+    """Return the PDF for `data`, rendering it only if it is not cached yet."""
+    key = hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+    with pdf_cache_lock:
+        if key in pdf_cache:
+            pdf_cache.move_to_end(key)
+            return pdf_cache[key]
+
+    pdf = render_documentation_pdf(data)
+    with pdf_cache_lock:
+        pdf_cache[key] = pdf
+        while len(pdf_cache) > PDF_CACHE_SIZE:
+            pdf_cache.popitem(last=False)
+    return pdf
+
+@app.post("/download-pdf")
+async def download_pdf(request: DocumentationData):
+    """Render the documentation to PDF on the server and stream it back."""
+    try:
+        pdf = await asyncio.to_thread(get_documentation_pdf, request.data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
+
+    def chunks():
+        for offset in range(0, len(pdf), PDF_CHUNK_SIZE):
+            yield pdf[offset:offset + PDF_CHUNK_SIZE]
+
+    return StreamingResponse(chunks(), media_type="application/pdf", headers={
+        "Content-Disposition": 'attachment; filename="project_documentation.pdf"',
+        "Content-Length": str(len(pdf)),
+    })
+
+def analyze_files(source_path: str) -> tuple:
+    """Analyze and categorize files in the source directory.
+
+    Returns (file_types_found, source_files), both collected in the same walk.
+    """
+    file_types_found = {}
+    source_files = []
+    
+    try:
+        # Stream files out of a single pruned walk and categorize them on the fly
+        with pipeline_metrics.stage('walk'):
+            for file_path in iter_project_files(source_path):
+                file_type = categorize_file(os.path.basename(file_path))
+                file_types_found[file_type] = file_types_found.get(file_type, 0) + 1
+                if is_source_file(file_path):
+                    source_files.append(file_path)
+        pipeline_metrics.count('files_walked', sum(file_types_found.values()))
+            
+        return file_types_found, source_files
+        
+    except Exception as e:
+        print(f"Error analyzing files: {str(e)}")
+        return {}, []
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+
+class ProjectManifests:
+    """Per-project manifests recording the state of the last completed analysis.
+
+    A manifest holds the content hash and summary of every source file fed to
+    the model, the file-type counts, and the resulting architecture sections,
+    so the next run can re-document only what changed since then. Manifests
+    are stored as one JSON file per project, named after a hash of its path.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.manifest_dir = os.path.join(cache_dir, 'manifests')
+        os.makedirs(self.manifest_dir, exist_ok=True)
+
+    def _path(self, source_path: str) -> str:
+        name = hashlib.sha256(source_path.encode('utf-8')).hexdigest()
+        return os.path.join(self.manifest_dir, f'{name}.json')
+
+    def load(self, source_path: str):
+        """Return the manifest for `source_path`, or None if there is none."""
+        try:
+            with open(self._path(source_path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, source_path: str, manifest: dict):
+        """Atomically replace the manifest for `source_path`."""
+        manifest = dict(manifest, source_path=source_path, updated_at=time.time())
+        # A unique temporary file per write, so concurrent saves of the same
+        # project never share one; the last replace wins
+        fd, tmp_path = tempfile.mkstemp(dir=self.manifest_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, self._path(source_path))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def diff_files(previous: dict, current: dict) -> dict:
+    """Compare two {relative path: content hash} mappings."""
+    return {
+        'added': sorted(path for path in current if path not in previous),
+        'modified': sorted(path for path in current if path in previous and previous[path] != current[path]),
+        'deleted': sorted(path for path in previous if path not in current),
+    }
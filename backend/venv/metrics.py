@@ -0,0 +1,78 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Metrics of the request currently being processed; propagates into asyncio
+# tasks and asyncio.to_thread workers because both copy the context
+_request_metrics = ContextVar('request_metrics', default=None)
+
+
+class PipelineMetrics:
+    """Per-stage timings and byte/token counters for the analysis pipeline.
+
+    Every measurement is added to process-wide totals (served by /metrics)
+    and, inside a `track_request()` block, to that request's own metrics.
+    Stages may nest: prompt building includes the Ollama calls it makes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._counters = {}
+        self.started_at = time.time()
+
+    @contextmanager
+    def track_request(self):
+        """Collect the metrics of everything run inside this block; yields them."""
+        request_metrics = {'stages': {}, 'counters': {}}
+        token = _request_metrics.set(request_metrics)
+        try:
+            yield request_metrics
+        finally:
+            _request_metrics.reset(token)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        request_metrics = _request_metrics.get()
+        with self._lock:
+            targets = [self._stages]
+            if request_metrics is not None:
+                targets.append(request_metrics['stages'])
+            for stages in targets:
+                stats = stages.setdefault(name, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+                stats['count'] += 1
+                stats['total_seconds'] += seconds
+                stats['max_seconds'] = max(stats['max_seconds'], seconds)
+
+    def count(self, name: str, value: int = 1):
+        """Add to a byte/token/call counter."""
+        request_metrics = _request_metrics.get()
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            if request_metrics is not None:
+                counters = request_metrics['counters']
+                counters[name] = counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """Return a copy of the process-wide totals."""
+        with self._lock:
+            return {
+                'uptime_seconds': time.time() - self.started_at,
+                'stages': {name: dict(stats) for name, stats in self._stages.items()},
+                'counters': dict(self._counters),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._counters = {}
+            self.started_at = time.time()
@@ -0,0 +1,104 @@
+"""Local stand-in for Ollama's /api/generate, used by the benchmark harness.
+
+Answers file-summary prompts with one `File:` block per file named in the
+prompt and every other prompt with the six documentation sections, after a
+configurable latency and at a configurable token rate, so the LLM path can
+be measured offline:
+
+    python ollama_stub.py --port 11434 --latency 0.5 --tokens-per-second 200
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECTIONS = [
+    'Project Architecture',
+    'Project Overview',
+    'Tech Stack',
+    'Key Features in Components',
+    'Implementation Flow',
+    'Future Improvements',
+]
+
+FILE_HEADER_RE = re.compile(r'^File: (.+)$', re.MULTILINE)
+
+
+def build_response(prompt: str) -> str:
+    """Return a deterministic completion shaped like CodeLlama's output."""
+    if prompt.startswith('Summarize each of the following'):
+        return '\n'.join(
+            f"File: {label}\nDefines the components of {label} and their interactions."
+            for label in FILE_HEADER_RE.findall(prompt)
+        )
+    if prompt.startswith('Condense the following'):
+        return 'A group of modules implementing part of the project.'
+    # Incremental prompts list the sections to rewrite; full prompts get all six
+    requested = [section for section in SECTIONS if f". {section}:" in prompt.split('Use exactly these numbered headers:')[-1]]
+    return '\n'.join(
+        f"{index + 1}. {section}:\n- Stub content for {section.lower()}.\n"
+        for index, section in enumerate(requested or SECTIONS)
+    )
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    tokens_per_second = 0.0
+
+    def do_POST(self):
+        if self.path != '/api/generate':
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        text = build_response(body.get('prompt', ''))
+        time.sleep(self.latency)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson' if body.get('stream', True) else 'application/json')
+        self.end_headers()
+        if not body.get('stream', True):
+            self._sleep_for_tokens(text)
+            self.wfile.write(json.dumps({'model': body.get('model'), 'response': text, 'done': True}).encode())
+            return
+
+        # Stream roughly one token (four characters) per chunk, like Ollama does
+        for offset in range(0, len(text), 4):
+            token = text[offset:offset + 4]
+            self._sleep_for_tokens(token)
+            self.wfile.write((json.dumps({'response': token, 'done': False}) + '\n').encode())
+            self.wfile.flush()
+        self.wfile.write((json.dumps({'response': '', 'done': True}) + '\n').encode())
+
+    def _sleep_for_tokens(self, text: str):
+        if self.tokens_per_second:
+            time.sleep(max(1, len(text) // 4) / self.tokens_per_second)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port: int = 0, latency: float = 0.0, tokens_per_second: float = 0.0) -> ThreadingHTTPServer:
+    """Start the stub on a background thread; port 0 picks a free port."""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {
+        'latency': latency, 'tokens_per_second': tokens_per_second,
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before each response starts')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0, help='0 disables the token rate limit')
+    args = parser.parse_args()
+    server = start_stub(args.port, args.latency, args.tokens_per_second)
+    print(f"Ollama stub listening on http://127.0.0.1:{server.server_address[1]}/api/generate")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
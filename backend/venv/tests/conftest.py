@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# main reads its configuration from the environment at import time, so point
+# its caches at a scratch directory before any test imports it
+os.environ.setdefault('AUTODOC_CACHE_DIR', tempfile.mkdtemp(prefix='autodoc-tests-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
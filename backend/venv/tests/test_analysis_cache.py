@@ -0,0 +1,44 @@
+import analysis_cache
+from analysis_cache import AnalysisCache
+
+
+def test_file_hashes_are_capped_dropping_least_recently_hashed(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache, 'FILE_HASH_EVICT_INTERVAL', 5)
+    cache = AnalysisCache(str(tmp_path / 'cache'), max_file_hashes=10)
+    paths = []
+    for index in range(30):
+        path = tmp_path / f'file_{index}.py'
+        path.write_text(str(index))
+        paths.append(str(path))
+        cache.file_hashes([str(path)])
+
+    assert cache.stats()['file_hashes'] == 10
+    kept = {row[0] for row in cache._conn.execute('SELECT path FROM file_hashes')}
+    assert kept == set(paths[-10:])
+
+
+def test_file_hashes_batch_reuses_unchanged_and_skips_missing(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'cache'))
+    first, second = tmp_path / 'a.py', tmp_path / 'b.py'
+    first.write_text('a')
+    second.write_text('b')
+    hashes = cache.file_hashes([str(first), str(second), str(tmp_path / 'missing.py')])
+    assert list(hashes) == [str(first), str(second)]
+    assert hashes[str(first)] == analysis_cache.sha256_file(str(first))
+
+    second.write_text('changed')
+    updated = cache.file_hashes([str(first), str(second)])
+    assert updated[str(first)] == hashes[str(first)]
+    assert updated[str(second)] == analysis_cache.sha256_file(str(second))
+    assert cache.stats()['file_hashes'] == 2
+
+
+def test_lru_reads_defer_access_time_writes_until_the_next_write(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'cache'), max_summaries=2)
+    cache.put_summaries({'old': 'first', 'new': 'second'})
+    # Reading 'old' makes 'new' the least recently used entry
+    assert cache.get_summary('old') == 'first'
+    assert cache._conn.in_transaction is False
+    cache.put_summaries({'newest': 'third'})
+    assert cache.get_summary('new') is None
+    assert cache.get_summary('old') == 'first'
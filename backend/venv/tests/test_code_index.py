@@ -0,0 +1,67 @@
+from code_index import build_import_graph, format_import_graph
+
+
+def python_entry(*imports) -> dict:
+    return {'language': 'python', 'imports': list(imports), 'classes': [], 'functions': []}
+
+
+def script_entry(*imports) -> dict:
+    return {'language': 'javascript', 'imports': list(imports), 'classes': [], 'functions': []}
+
+
+def test_stdlib_names_shadowed_by_nested_project_files_stay_external():
+    graph = build_import_graph({
+        'app.py': python_entry('types', 'logging', 'pkg.types'),
+        'pkg/__init__.py': python_entry(),
+        'pkg/types.py': python_entry(),
+        'lib/logging.py': python_entry(),
+    })
+    assert graph['app.py'] == {'internal': ['pkg/types.py'], 'external': ['types', 'logging']}
+
+
+def test_imports_resolve_against_src_root_and_relative_paths():
+    graph = build_import_graph({
+        'src/core/__init__.py': python_entry('.engine'),
+        'src/core/engine.py': python_entry('core.util', '..core', 'util'),
+        'src/core/util.py': python_entry(),
+    })
+    assert graph['src/core/__init__.py']['internal'] == ['src/core/engine.py']
+    assert graph['src/core/engine.py'] == {
+        'internal': ['src/core/util.py', 'src/core/__init__.py'],
+        'external': ['util'],
+    }
+
+
+def test_script_directories_resolve_sibling_modules():
+    graph = build_import_graph({
+        'backend/main.py': python_entry('jobs', 'fastapi'),
+        'backend/jobs.py': python_entry(),
+    })
+    assert graph['backend/main.py'] == {'internal': ['backend/jobs.py'], 'external': ['fastapi']}
+
+
+def test_script_imports_resolve_relative_specifiers_only():
+    graph = build_import_graph({
+        'src/App.jsx': script_entry('react', './components/Viewer', '@scope/pkg/sub', './index.css'),
+        'src/components/Viewer.jsx': script_entry(),
+    })
+    assert graph['src/App.jsx'] == {
+        'internal': ['src/components/Viewer.jsx'],
+        'external': ['react', '@scope/pkg'],
+    }
+
+
+def test_import_graph_lists_the_most_imported_files_first():
+    text = format_import_graph(build_import_graph({
+        'a_cli.py': python_entry('core', 'util'),
+        'b_api.py': python_entry('core'),
+        'core.py': python_entry('util'),
+        'util.py': python_entry(),
+        'z_tool.py': python_entry('requests'),
+    }))
+    assert text.splitlines() == [
+        'core.py -> util.py',
+        'a_cli.py -> core.py, util.py',
+        'b_api.py -> core.py',
+        'z_tool.py -> external: requests',
+    ]
@@ -0,0 +1,178 @@
+import asyncio
+import time
+
+from jobs import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, JobQueue, JobStore
+
+
+async def wait_for_status(store: JobStore, job_id: str, statuses, timeout: float = 5.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = store.get(job_id)
+        if job['status'] in statuses or asyncio.get_running_loop().time() > deadline:
+            return job
+        await asyncio.sleep(0.01)
+
+
+def run_queue(tmp_path, runner, scenario):
+    async def main():
+        queue = JobQueue(JobStore(str(tmp_path)), runner, workers=1)
+        await queue.start()
+        try:
+            return await scenario(queue)
+        finally:
+            await queue.stop()
+    return asyncio.run(main())
+
+
+def test_job_runs_to_completion(tmp_path):
+    async def runner(source_path, force_refresh, report):
+        report(files_scanned=3)
+        return {'source_path': source_path}
+
+    async def scenario(queue):
+        job = await queue.submit('/project')
+        return await wait_for_status(queue.store, job['id'], (COMPLETED, FAILED))
+
+    job = run_queue(tmp_path, runner, scenario)
+    assert job['status'] == COMPLETED
+    assert job['result'] == {'source_path': '/project'}
+    assert job['progress'] == {'files_scanned': 3}
+
+
+def test_cancel_running_job_stays_cancelled(tmp_path):
+    started = []
+
+    async def runner(source_path, force_refresh, report):
+        started.append(source_path)
+        await asyncio.sleep(0.2)
+        return {}
+
+    async def scenario(queue):
+        job = await queue.submit('/project')
+        await wait_for_status(queue.store, job['id'], (RUNNING,))
+        while not started:
+            await asyncio.sleep(0.01)
+        await queue.cancel(job['id'])
+        await asyncio.sleep(0.4)
+        return queue.store.get(job['id'])
+
+    job = run_queue(tmp_path, runner, scenario)
+    assert job['status'] == CANCELLED
+    assert job['result'] is None
+
+
+class SlowPickupStore(JobStore):
+    """Stalls the QUEUED -> RUNNING write so a cancel lands in between."""
+
+    def update(self, job_id, *args, **fields):
+        if fields.get('status') == RUNNING:
+            time.sleep(0.2)
+        return super().update(job_id, *args, **fields)
+
+
+def test_cancel_while_job_is_picked_up_is_not_overwritten(tmp_path):
+    completed = []
+
+    async def runner(source_path, force_refresh, report):
+        completed.append(source_path)
+        return {}
+
+    async def main():
+        queue = JobQueue(SlowPickupStore(str(tmp_path)), runner, workers=1)
+        await queue.start()
+        try:
+            job = await queue.submit('/project')
+            await asyncio.sleep(0.05)
+            await queue.cancel(job['id'])
+            await asyncio.sleep(0.4)
+            return queue.store.get(job['id'])
+        finally:
+            await queue.stop()
+
+    job = asyncio.run(main())
+    assert job['status'] == CANCELLED
+    assert completed == []
+
+
+def test_failed_job_records_error(tmp_path):
+    async def runner(source_path, force_refresh, report):
+        raise ValueError('boom')
+
+    async def scenario(queue):
+        job = await queue.submit('/project')
+        return await wait_for_status(queue.store, job['id'], (COMPLETED, FAILED))
+
+    job = run_queue(tmp_path, runner, scenario)
+    assert job['status'] == FAILED
+    assert job['error'] == 'boom'
+
+
+def test_jobs_interrupted_by_shutdown_are_requeued(tmp_path):
+    async def runner(source_path, force_refresh, report):
+        await asyncio.sleep(10)
+
+    async def scenario(queue):
+        job = await queue.submit('/project')
+        await wait_for_status(queue.store, job['id'], (RUNNING,))
+        await asyncio.sleep(0.05)
+        return job['id']
+
+    job_id = run_queue(tmp_path, runner, scenario)
+    assert JobStore(str(tmp_path)).get(job_id)['status'] == QUEUED
+
+
+class CountingStore(JobStore):
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir)
+        self.progress_writes = 0
+
+    def update(self, job_id, *args, **fields):
+        if 'progress' in fields:
+            self.progress_writes += 1
+        return super().update(job_id, *args, **fields)
+
+
+def test_progress_reports_are_coalesced_off_the_event_loop(tmp_path):
+    async def runner(source_path, force_refresh, report):
+        for index in range(500):
+            report(sections_generated=index + 1)
+            if index % 100 == 0:
+                await asyncio.sleep(0)
+        return {}
+
+    async def main():
+        queue = JobQueue(CountingStore(str(tmp_path)), runner, workers=1)
+        await queue.start()
+        try:
+            job = await queue.submit('/project')
+            return queue.store, await wait_for_status(queue.store, job['id'], (COMPLETED, FAILED))
+        finally:
+            await queue.stop()
+
+    store, job = asyncio.run(main())
+    assert job['status'] == COMPLETED
+    assert job['progress'] == {'sections_generated': 500}
+    assert store.progress_writes < 50
+
+
+def test_force_refresh_does_not_join_a_cached_job(tmp_path):
+    store = JobStore(str(tmp_path))
+    cached = store.create('/project', force_refresh=False)
+    assert store.find_active('/project')['id'] == cached['id']
+    assert store.find_active('/project', force_refresh=True) is None
+
+    refresh = store.create('/project', force_refresh=True)
+    assert store.find_active('/project', force_refresh=True)['id'] == refresh['id']
+
+
+def test_finished_jobs_beyond_the_retention_limit_are_pruned(tmp_path):
+    store = JobStore(str(tmp_path), max_finished_jobs=3)
+    finished = []
+    for _ in range(5):
+        job = store.create('/project', force_refresh=False)
+        store.update(job['id'], status=COMPLETED)
+        finished.append(job['id'])
+    active = store.create('/other', force_refresh=False)
+
+    assert [store.get(job_id) is not None for job_id in finished] == [False, False, True, True, True]
+    assert store.get(active['id'])['status'] == QUEUED
@@ -0,0 +1,359 @@
+import asyncio
+import json
+import os
+
+import httpx
+
+import main
+
+
+def write_files(root, files: dict):
+    for rel_path, content in files.items():
+        path = os.path.join(root, *rel_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+
+def walked(root) -> set:
+    return {
+        os.path.relpath(path, root).replace(os.sep, '/')
+        for path in main.iter_project_files(str(root))
+    }
+
+
+def gitignore_rules(root, content: str) -> list:
+    write_files(root, {'.gitignore': content})
+    return main.load_gitignore(str(root), '')
+
+
+def test_glob_to_regex_wildcards_stay_within_one_segment():
+    assert main._glob_to_regex('*.log') == r'[^/]*\.log'
+    assert main._glob_to_regex('a?c') == 'a[^/]c'
+    assert main._glob_to_regex('[!a]b') == '[^a]b'
+    assert main._glob_to_regex('**/cache') == '(?:.*/)?cache'
+
+
+def test_unanchored_pattern_matches_at_any_depth(tmp_path):
+    rules = gitignore_rules(tmp_path, '*.log\n')
+    assert main.is_ignored('debug.log', False, rules)
+    assert main.is_ignored('src/deep/debug.log', False, rules)
+    assert not main.is_ignored('debug.log.txt', False, rules)
+
+
+def test_pattern_with_slash_is_anchored_to_gitignore_directory(tmp_path):
+    rules = gitignore_rules(tmp_path, '/build\ndocs/generated\n')
+    assert main.is_ignored('build', True, rules)
+    assert not main.is_ignored('src/build', True, rules)
+    assert main.is_ignored('docs/generated', True, rules)
+    assert not main.is_ignored('src/docs/generated', True, rules)
+
+
+def test_negation_re_includes_and_last_match_wins(tmp_path):
+    rules = gitignore_rules(tmp_path, '*.log\n!keep.log\n')
+    assert main.is_ignored('other.log', False, rules)
+    assert not main.is_ignored('keep.log', False, rules)
+    assert not main.is_ignored('logs/keep.log', False, rules)
+
+
+def test_dir_only_rule_skips_files_of_the_same_name(tmp_path):
+    rules = gitignore_rules(tmp_path, 'output/\n')
+    assert main.is_ignored('output', True, rules)
+    assert main.is_ignored('src/output', True, rules)
+    assert not main.is_ignored('output', False, rules)
+
+
+def test_comments_and_blank_lines_are_skipped(tmp_path):
+    assert gitignore_rules(tmp_path, '# comment\n\n   \n') == []
+
+
+def test_nested_gitignore_applies_below_its_directory(tmp_path):
+    write_files(tmp_path, {
+        'app.py': '',
+        'notes.tmp': '',
+        'pkg/.gitignore': '*.tmp\n/local.py\n',
+        'pkg/mod.py': '',
+        'pkg/scratch.tmp': '',
+        'pkg/local.py': '',
+        'pkg/sub/local.py': '',
+    })
+    assert walked(tmp_path) == {
+        'app.py', 'notes.tmp', 'pkg/.gitignore', 'pkg/mod.py', 'pkg/sub/local.py',
+    }
+
+
+def test_walk_prunes_excluded_and_ignored_directories(tmp_path):
+    write_files(tmp_path, {
+        '.gitignore': 'build/\n',
+        'main.py': '',
+        'Dockerfile': '',
+        'LICENSE': '',
+        'node_modules/pkg/index.js': '',
+        'venv/lib/site.py': '',
+        'build/out.js': '',
+        'src/build.py': '',
+    })
+    assert walked(tmp_path) == {'.gitignore', 'main.py', 'Dockerfile', 'src/build.py'}
+
+
+def test_analyze_files_collects_source_files_in_the_same_walk(tmp_path):
+    write_files(tmp_path, {
+        'app.py': '',
+        'src/App.jsx': '',
+        'README.md': '',
+        'Dockerfile': '',
+    })
+    file_types_found, source_files = main.analyze_files(str(tmp_path))
+    assert sum(file_types_found.values()) == 4
+    assert {os.path.relpath(path, tmp_path).replace(os.sep, '/') for path in source_files} == {
+        'app.py', 'src/App.jsx', 'Dockerfile',
+    }
+
+
+ANALYSIS_TEXT = (
+    "Intro text before any header\n"
+    "1. Project Architecture:\n"
+    "- Layered FastAPI backend\n"
+    "\n"
+    "2. Tech Stack:\n"
+    "- Python\n"
+    "- React\n"
+    "3. Future Improvements:\n"
+    "- Tests"
+)
+
+
+def feed_in_chunks(text: str, size: int) -> tuple:
+    parser = main.SectionParser()
+    completed = []
+    for offset in range(0, len(text), size):
+        completed.extend(parser.feed(text[offset:offset + size]))
+    completed.extend(parser.close())
+    return completed, parser.result()
+
+
+def test_section_parser_matches_whole_text_parsing_for_any_chunk_size():
+    expected = {
+        'Project Architecture': '- Layered FastAPI backend',
+        'Tech Stack': '- Python\n- React',
+        'Future Improvements': '- Tests',
+    }
+    assert main.parse_sections(ANALYSIS_TEXT) == expected
+    for size in (1, 2, 3, 7, 16, len(ANALYSIS_TEXT)):
+        completed, result = feed_in_chunks(ANALYSIS_TEXT, size)
+        assert result == expected
+        assert completed == list(expected.items())
+
+
+def test_section_parser_header_split_across_chunks_completes_previous_section():
+    parser = main.SectionParser()
+    assert parser.feed("1. Project Overview:\nA tool\n2. Tech") == []
+    assert parser.feed(" Stack:\n- Python\n") == [('Project Overview', 'A tool')]
+    assert parser.close() == [('Tech Stack', '- Python')]
+
+
+def make_manifest(files: dict, sections=None, file_types_found=None) -> dict:
+    return {
+        'model': main.OLLAMA_MODEL,
+        'prompt_version': main.PROMPT_VERSION,
+        'files': files,
+        'summaries': {path: f"summary of {path}" for path in files},
+        'file_types_found': file_types_found or {'Python': len(files)},
+        'architecture_analysis': {section: 'previous' for section in (sections or [
+            'Project Architecture', 'Project Overview', 'Tech Stack',
+            'Key Features in Components', 'Implementation Flow', 'Future Improvements',
+        ])},
+    }
+
+
+PROJECT_FILES = {f'pkg/mod_{index}.py': f'hash-{index}' for index in range(10)}
+
+
+def test_plan_modified_file_updates_component_sections():
+    current = dict(PROJECT_FILES, **{'pkg/mod_0.py': 'changed'})
+    changes, affected = main.plan_incremental_update(make_manifest(PROJECT_FILES), current, {'Python': 10})
+    assert changes == {'added': [], 'modified': ['pkg/mod_0.py'], 'deleted': []}
+    assert affected == ['Key Features in Components', 'Implementation Flow']
+
+
+def test_plan_added_and_deleted_files_update_architecture():
+    current = dict(PROJECT_FILES)
+    del current['pkg/mod_0.py']
+    current['pkg/new.py'] = 'new'
+    changes, affected = main.plan_incremental_update(make_manifest(PROJECT_FILES), current, {'Python': 10})
+    assert changes == {'added': ['pkg/new.py'], 'modified': [], 'deleted': ['pkg/mod_0.py']}
+    assert affected == ['Project Architecture', 'Key Features in Components', 'Implementation Flow']
+
+
+def test_plan_dependency_file_and_file_type_changes_update_tech_stack():
+    previous = dict(PROJECT_FILES, Dockerfile='docker')
+    current = dict(previous, Dockerfile='changed')
+    _, affected = main.plan_incremental_update(make_manifest(previous), current, {'Python': 10, 'Docker': 1})
+    assert affected == ['Project Architecture', 'Tech Stack', 'Key Features in Components', 'Implementation Flow']
+
+
+def test_plan_only_regenerates_sections_the_previous_analysis_had():
+    current = dict(PROJECT_FILES, **{'pkg/mod_0.py': 'changed'})
+    manifest = make_manifest(PROJECT_FILES, sections=['Project Overview', 'Implementation Flow'])
+    _, affected = main.plan_incremental_update(manifest, current, {'Python': 10})
+    assert affected == ['Implementation Flow']
+
+
+def test_plan_unchanged_project_affects_no_sections():
+    changes, affected = main.plan_incremental_update(make_manifest(PROJECT_FILES), PROJECT_FILES, {'Python': 10})
+    assert changes == {'added': [], 'modified': [], 'deleted': []}
+    assert affected == []
+
+
+def test_plan_falls_back_to_full_analysis():
+    current = dict(PROJECT_FILES, **{f'pkg/mod_{index}.py': 'changed' for index in range(4)})
+    assert main.plan_incremental_update(make_manifest(PROJECT_FILES), current, {'Python': 10}) is None
+    assert main.plan_incremental_update(None, PROJECT_FILES, {'Python': 10}) is None
+    assert main.plan_incremental_update(
+        dict(make_manifest(PROJECT_FILES), model='other-model'), PROJECT_FILES, {'Python': 10}
+    ) is None
+    manifest = make_manifest(PROJECT_FILES)
+    del manifest['summaries']['pkg/mod_1.py']
+    assert main.plan_incremental_update(manifest, PROJECT_FILES, {'Python': 10}) is None
+
+
+def test_every_pdf_icon_is_drawn_without_an_icon_font():
+    icons = {*main.SECTION_ICONS.values(), main.DEFAULT_SECTION_ICON, main.FILE_COMPOSITION_ICON}
+    assert icons <= set(main.PDF_ICON_DRAWERS)
+
+
+def test_long_pdf_sections_render_one_paragraph_per_line():
+    content = '\n'.join(f"- item {index} <b>&</b>" for index in range(2000))
+    pdf = main.render_documentation_pdf({
+        'architecture_analysis': {'Tech Stack': content, 'Unknown Section': ''},
+        'file_types_found': {'Python': 2},
+    })
+    assert pdf.startswith(b'%PDF')
+    assert pdf.count(b'/Type /Page\n') > 20
+
+
+def test_split_text_keeps_short_text_whole_and_splits_on_lines():
+    assert main.split_text('short', 10) == ['short']
+    text = ''.join(f"line {index:02d}\n" for index in range(20))
+    pieces = main.split_text(text, 5)
+    assert ''.join(pieces) == text
+    assert all(len(piece) <= 5 * main.CHARS_PER_TOKEN for piece in pieces)
+    assert all(piece.endswith('\n') for piece in pieces)
+
+
+def test_split_text_breaks_over_long_lines():
+    text = 'a' * 50 + '\nshort\n'
+    pieces = main.split_text(text, 5)
+    assert ''.join(pieces) == text
+    assert pieces == ['a' * 20, 'a' * 20, 'a' * 10 + '\nshort\n']
+    assert all(len(piece) <= 20 for piece in pieces)
+
+
+def test_iter_source_chunks_labels_parts_and_respects_budget():
+    items = [('/p/a.py', 'a.py', 'x' * 30), ('/p/big.py', 'big.py', 'y\n' * 50), ('/p/c.py', 'c.py', 'z')]
+    chunks = list(main.iter_source_chunks(iter(items), 10))
+    labels = [label for chunk in chunks for _, label, _ in chunk]
+    assert labels[0] == 'a.py'
+    assert labels[-1] == 'c.py'
+    parts = [label for label in labels if label.startswith('big.py')]
+    assert parts == [f"big.py (part {index + 1}/{len(parts)})" for index in range(len(parts))]
+    for chunk in chunks:
+        assert len(chunk) == 1 or sum(main.estimate_tokens(text) for _, _, text in chunk) <= 10
+
+
+def test_parse_file_summaries_handles_markdown_and_multi_part_labels():
+    labels = ['src/a.py', 'src/b.py (part 1/2)', 'src/b.py (part 2/2)']
+    text = (
+        "Here are the summaries:\n"
+        "**File: `src/a.py`**\n"
+        "Entry point.\n"
+        "### File: `src/b.py` (part 1/2)\n"
+        "First half.\n"
+        "- File: src/b.py (part 2/2)\n"
+        "Second half.\n"
+        "File: src/unknown.py\n"
+        "Still part two.\n"
+    )
+    assert main.parse_file_summaries(text, labels) == {
+        'src/a.py': 'Entry point.',
+        'src/b.py (part 1/2)': 'First half.',
+        'src/b.py (part 2/2)': 'Second half.\nFile: src/unknown.py\nStill part two.',
+    }
+
+
+def test_parse_file_summaries_uses_whole_text_only_for_single_label():
+    assert main.parse_file_summaries('Does things.', ['a.py']) == {'a.py': 'Does things.'}
+    assert main.parse_file_summaries('Does things.', ['a.py', 'b.py']) == {}
+
+
+def test_summarize_chunk_resummarizes_skipped_files_on_their_own(monkeypatch):
+    prompts = []
+
+    async def fake_generate(prompt):
+        prompts.append(prompt)
+        if 'File: a.py' in prompt:
+            return 'File: a.py\nSummary of a.'
+        return 'Summary of b alone.'
+
+    monkeypatch.setattr(main, 'generate_with_ollama', fake_generate)
+    chunk = [('/p/a.py', 'a.py', 'code a'), ('/p/b.py', 'b.py', 'code b')]
+    result = asyncio.run(main.summarize_chunk(chunk))
+    assert result == [('/p/a.py', 'Summary of a.'), ('/p/b.py', 'Summary of b alone.')]
+    assert len(prompts) == 2
+
+
+def test_unsummarized_files_are_not_cached(monkeypatch, tmp_path):
+    write_files(tmp_path, {'a.py': 'a = 1\n', 'b.py': 'b = 2\n'})
+    paths = [str(tmp_path / 'a.py'), str(tmp_path / 'b.py')]
+    stored = {}
+
+    async def fake_generate(prompt):
+        return 'File: a.py\nSummary of a.' if 'File: a.py' in prompt else ''
+
+    monkeypatch.setattr(main, 'generate_with_ollama', fake_generate)
+    monkeypatch.setattr(main, 'OUTLINE_SUMMARY_TOKENS', 0)
+    monkeypatch.setattr(main.analysis_cache, 'get_summary', lambda key: None)
+    monkeypatch.setattr(main.analysis_cache, 'put_summaries', stored.update)
+    outlines = {paths[0]: 'a = 1', paths[1]: 'b = 2'}
+    summaries = asyncio.run(main.summarize_source_files(str(tmp_path), outlines))
+    assert summaries == [('a.py', 'Summary of a.')]
+    assert list(stored.values()) == ['Summary of a.']
+
+
+def test_index_source_files_returns_outlines_and_truncated_import_graph(monkeypatch, tmp_path):
+    files = {'core.py': 'def run():\n    pass\n'}
+    files.update({f"mod_{index:02d}.py": 'import core\n' for index in range(40)})
+    write_files(tmp_path, files)
+    paths = [str(tmp_path / name) for name in files]
+    monkeypatch.setattr(main, 'IMPORT_GRAPH_TOKEN_BUDGET', 20)
+
+    outlines, import_graph = asyncio.run(main.index_source_files(str(tmp_path), paths))
+    assert set(outlines) == set(paths)
+    assert 'def run()' in outlines[paths[0]]
+    assert len(import_graph) <= 20 * main.CHARS_PER_TOKEN
+    assert import_graph.startswith('mod_00.py -> core.py')
+
+    _, no_graph = asyncio.run(main.index_source_files(str(tmp_path), paths, with_import_graph=False))
+    assert no_graph is None
+
+
+def test_ollama_stage_excludes_time_the_consumer_spends_between_tokens(monkeypatch):
+    body = '\n'.join(json.dumps({'response': token, 'done': token == 'c'}) for token in 'abc')
+
+    async def consume():
+        monkeypatch.setattr(main, 'ollama_semaphore', asyncio.Semaphore(1))
+        monkeypatch.setattr(main, 'ollama_client', httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+        ))
+        tokens = []
+        with main.pipeline_metrics.track_request() as request_metrics:
+            async for token in main.stream_with_ollama('prompt'):
+                tokens.append(token)
+                await asyncio.sleep(0.1)
+        await main.ollama_client.aclose()
+        return tokens, request_metrics
+
+    tokens, request_metrics = asyncio.run(consume())
+    assert tokens == ['a', 'b', 'c']
+    assert request_metrics['stages']['ollama']['count'] == 1
+    assert request_metrics['stages']['ollama']['total_seconds'] < 0.1
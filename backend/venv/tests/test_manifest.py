@@ -0,0 +1,32 @@
+import os
+import threading
+
+from manifest import ProjectManifests, diff_files
+
+
+def test_diff_files_classifies_changes():
+    previous = {'a.py': '1', 'b.py': '2', 'c.py': '3'}
+    current = {'a.py': '1', 'b.py': 'changed', 'd.py': '4'}
+    assert diff_files(previous, current) == {'added': ['d.py'], 'modified': ['b.py'], 'deleted': ['c.py']}
+
+
+def test_concurrent_saves_of_one_project_leave_a_complete_manifest(tmp_path):
+    manifests = ProjectManifests(str(tmp_path))
+    errors = []
+
+    def save(writer: int):
+        try:
+            for _ in range(20):
+                manifests.save('/project', {'writer': writer, 'files': {str(i): 'x' * 64 for i in range(200)}})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(writer,)) for writer in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(manifests.load('/project')['files']) == 200
+    assert [name for name in os.listdir(manifests.manifest_dir) if name.endswith('.tmp')] == []
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { Book } from "lucide-react";
 import DocumentationViewer from "./components/DocumentViewer";
 
@@ -113,35 +113,95 @@ export default function App() {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [documentationData, setDocumentationData] = useState(null);
+  // Becomes true once the stream's "done" event arrives
+  const [generationComplete, setGenerationComplete] = useState(false);
+  const streamControllerRef = useRef(null);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
+    streamControllerRef.current?.abort();
+    const controller = new AbortController();
+    streamControllerRef.current = controller;
     setLoading(true);
     setError(null);
+    setGenerationComplete(false);
 
     try {
-      const response = await fetch("http://localhost:8000/analyze-folder", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          source_path: sourcePath.replace(/\\/g, "/"),
-          // destination_path: destPath.replace(/\\/g, "/"),
-        }),
-      });
+      const response = await fetch(
+        "http://localhost:8000/analyze-folder/stream",
+        {
+          method: "POST",
+          headers: {
+            "Content-Type": "application/json",
+          },
+          body: JSON.stringify({
+            source_path: sourcePath.replace(/\\/g, "/"),
+            // destination_path: destPath.replace(/\\/g, "/"),
+          }),
+          signal: controller.signal,
+        }
+      );
 
       if (!response.ok) {
         const errorData = await response.json();
         throw new Error(errorData.detail || "Failed to analyze folder");
       }
 
-      const data = await response.json();
-      setDocumentationData(data);
+      // The backend streams NDJSON events: file type counts first, then one
+      // event per documentation section as soon as it is generated
+      const handleEvent = (event) => {
+        if (event.event === "file_types") {
+          setDocumentationData({
+            architecture_analysis: {},
+            file_types_found: event.file_types_found,
+            total_files: event.total_files,
+          });
+        } else if (event.event === "section") {
+          // The viewer may have been closed while the stream was running
+          setDocumentationData((prev) =>
+            prev
+              ? {
+                  ...prev,
+                  architecture_analysis: {
+                    ...prev.architecture_analysis,
+                    [event.section]: event.content,
+                  },
+                }
+              : prev
+          );
+        } else if (event.event === "done") {
+          setGenerationComplete(true);
+        } else if (event.event === "error") {
+          throw new Error(event.detail);
+        }
+      };
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      for (;;) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        lines.filter((line) => line.trim()).forEach((line) => {
+          handleEvent(JSON.parse(line));
+        });
+      }
+      if (buffer.trim()) {
+        handleEvent(JSON.parse(buffer));
+      }
     } catch (err) {
-      setError(err.message);
+      if (err.name !== "AbortError") {
+        setError(err.message);
+      }
     } finally {
-      setLoading(false);
+      // A newer submission or Back owns the loading state once this one is aborted
+      if (streamControllerRef.current === controller) {
+        streamControllerRef.current = null;
+        setLoading(false);
+      }
     }
   };
 
@@ -176,7 +236,6 @@ export default function App() {
   // };
 
   const handleDownloadPDF = async () => {
-    setLoading(true);
     try {
       // Log the data being sent
       console.log("Sending data:", documentationData);
@@ -220,14 +279,16 @@ export default function App() {
         window.URL.revokeObjectURL(url);
       }, 100);
     } catch (error) {
+      // Rethrow so the viewer can fall back to rendering the PDF in the browser
       console.error("Download error:", error);
-      setError(error.message);
-    } finally {
-      setLoading(false);
+      throw error;
     }
   };
 
   const handleBack = () => {
+    streamControllerRef.current?.abort();
+    streamControllerRef.current = null;
+    setLoading(false);
     setDocumentationData(null);
     setError(null);
   };
@@ -295,6 +356,8 @@ export default function App() {
         ) : (
           <DocumentationViewer
             data={documentationData}
+            generating={loading}
+            complete={generationComplete}
             onDownload={handleDownloadPDF}
             onBack={handleBack}
           />
@@ -2,11 +2,33 @@ import React, { useRef, useState } from "react";
 import { Download, ArrowLeft } from "lucide-react";
 import html2pdf from "html2pdf.js";
 
-const DocumentationViewer = ({ data, onBack }) => {
+const DocumentationViewer = ({
+  data,
+  generating = false,
+  complete = true,
+  onDownload,
+  onBack,
+}) => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const contentRef = useRef(null);
 
+  // Prefer the server-rendered PDF; html2pdf.js is the client-side fallback
+  // when there is no server download or it fails
+  const downloadPDF = async () => {
+    if (!onDownload) return generatePDF();
+    try {
+      setLoading(true);
+      setError(null);
+      await onDownload();
+    } catch (err) {
+      console.error("Server PDF download failed, generating in the browser:", err);
+      await generatePDF();
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const generatePDF = async () => {
     if (!contentRef.current) return;
     try {
@@ -42,6 +64,9 @@ const DocumentationViewer = ({ data, onBack }) => {
 
   if (!data) return null;
 
+  // Partial documentation must not be exported before every section arrived
+  const downloadDisabled = loading || !complete;
+
   const { architecture_analysis = {}, file_types_found = {} } = data;
   const totalFiles = Object.values(file_types_found).reduce((a, b) => a + b, 0);
 
@@ -80,19 +105,19 @@ const DocumentationViewer = ({ data, onBack }) => {
         </button>
 
         <button
-          onClick={generatePDF}
-          disabled={loading}
+          onClick={downloadPDF}
+          disabled={downloadDisabled}
           style={{
             display: "flex",
             alignItems: "center",
             gap: "8px",
-            backgroundColor: loading ? "#93c5fd" : "#3b82f6",
+            backgroundColor: downloadDisabled ? "#93c5fd" : "#3b82f6",
             color: "white",
             border: "none",
             padding: "8px 16px",
             borderRadius: "6px",
-            cursor: loading ? "not-allowed" : "pointer",
-            opacity: loading ? 0.7 : 1,
+            cursor: downloadDisabled ? "not-allowed" : "pointer",
+            opacity: downloadDisabled ? 0.7 : 1,
           }}
         >
           <Download size={20} />
@@ -207,6 +232,18 @@ const DocumentationViewer = ({ data, onBack }) => {
             </div>
           </section>
         ))}
+
+        {generating && (
+          <p
+            style={{
+              textAlign: "center",
+              color: "#6b7280",
+              fontSize: "14px",
+            }}
+          >
+            Generating remaining sections...
+          </p>
+        )}
       </div>
     </div>
   );